@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk HTTP revalidation cache for official-website fetches (SQLite).
+
+- Stores the (trimmed) body, final URL, content type, encoding, ETag and
+  Last-Modified of every page fetched with a validator; a head-only fetch
+  stores just the <head>, which later full fetches do not reuse
+- The next run sends If-None-Match / If-Modified-Since; a 304 is answered
+  from disk, so unchanged sites transfer only headers
+- Pages without ETag/Last-Modified, or marked Cache-Control: no-store, are
+  never stored
+- Also remembers which sites had their full body scanned by an enricher, so
+  Yes/blank columns left blank count as checked until --rescan-days pass
+- Safe to share across the enrichment worker threads
+"""
+
+from __future__ import annotations
+import sqlite3, threading, time, zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .stream import has_head, read_capped, sniff_encoding
+
+ROOT = Path(__file__).resolve().parents[3]   # repo root (scripts/enrich/crawl/ under root)
+CACHE_DIR = ROOT / "scripts" / "tmp" / "cache"
+DEFAULT_HTTP_CACHE_PATH = CACHE_DIR / "enrich_http.sqlite"
+DEFAULT_RESCAN_DAYS = 30.0
+
+
+class HttpCache:
+    def __init__(self, path: Path = DEFAULT_HTTP_CACHE_PATH, rescan_days: float = DEFAULT_RESCAN_DAYS):
+        self.path = Path(path)
+        self.rescan_sec = max(0.0, float(rescan_days)) * 86400
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " final_url TEXT NOT NULL,"
+            " etag TEXT NOT NULL,"
+            " last_modified TEXT NOT NULL,"
+            " content_type TEXT NOT NULL,"
+            " encoding TEXT,"
+            " complete INTEGER NOT NULL,"   # 1 = body not cut short (by max_bytes or head_only)
+            " body BLOB NOT NULL,"          # zlib-compressed
+            " fetched_at REAL NOT NULL,"
+            " checked_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scans ("
+            " url TEXT PRIMARY KEY,"
+            " scanned_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        self.revalidated = 0   # 304s served from disk
+        self.changed = 0       # had an entry, site sent a new body
+        self.new = 0           # no usable entry
+        self.bytes_saved = 0
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT final_url, etag, last_modified, content_type, encoding, complete, body"
+                " FROM pages WHERE url = ?", (url,))
+            row = cur.fetchone()
+        if row is None:
+            return None
+        final_url, etag, last_modified, content_type, encoding, complete, body = row
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            return None
+        return {"final_url": final_url, "etag": etag, "last_modified": last_modified,
+                "content_type": content_type, "encoding": encoding,
+                "complete": bool(complete), "body": body}
+
+    def put(self, url: str, r: requests.Response, complete: bool = True) -> None:
+        """Store a 200 response (r.content already read) if it carries a validator."""
+        etag = r.headers.get("ETag", "")
+        last_modified = r.headers.get("Last-Modified", "")
+        if not (etag or last_modified) or "no-store" in r.headers.get("Cache-Control", "").lower():
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, final_url, etag, last_modified, content_type, encoding,"
+                " complete, body, fetched_at, checked_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, r.url or url, etag, last_modified, r.headers.get("Content-Type", ""), r.encoding,
+                 int(complete), zlib.compress(r.content), now, now),
+            )
+            self._db.commit()
+
+    def touch(self, url: str, r: requests.Response) -> None:
+        """Record a 304; servers may send refreshed validators with it."""
+        sets, args = ["checked_at = ?"], [time.time()]
+        for col, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+            if r.headers.get(header):
+                sets.append(f"{col} = ?")
+                args.append(r.headers[header])
+        with self._lock:
+            self._db.execute(f"UPDATE pages SET {', '.join(sets)} WHERE url = ?", (*args, url))
+            self._db.commit()
+
+    def scanned(self, url: str) -> bool:
+        """Whether an enricher scanned the full body of `url` within rescan_days."""
+        if not self.rescan_sec:
+            return False
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM scans WHERE url = ? AND scanned_at >= ?",
+                                   (url, time.time() - self.rescan_sec)).fetchone()
+        return row is not None
+
+    def mark_scanned(self, url: str) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO scans (url, scanned_at) VALUES (?, ?)", (url, time.time()))
+            self._db.commit()
+
+    def note(self, outcome: str, saved: int = 0) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.bytes_saved += saved
+
+    def summary(self) -> str:
+        return (f"{self.revalidated} unchanged (304), {self.changed} changed, {self.new} new; "
+                f"{self.bytes_saved / 1e6:.1f} MB not re-downloaded")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def cached_response(entry: Dict[str, Any], r304: requests.Response) -> requests.Response:
+    """A 200 Response rebuilt from a cache entry, standing in for the 304."""
+    r = requests.Response()
+    r.status_code = 200
+    r.reason = "OK"
+    r.url = entry["final_url"]
+    r.headers = CaseInsensitiveDict(r304.headers)
+    r.headers["Content-Type"] = entry["content_type"]
+    r.headers.pop("Content-Length", None)
+    r.encoding = entry["encoding"]
+    r._content = entry["body"]
+    r.request = r304.request
+    r.history = r304.history
+    return r
+
+
+def usable(entry: Dict[str, Any], max_bytes: int, head_only: bool) -> bool:
+    """Whether a stored body holds everything this fetch would have read."""
+    body = entry["body"]
+    return entry["complete"] or len(body) >= max_bytes or (head_only and has_head(body))
+
+
+def conditional_get(sess: requests.Session, url: str, timeout: float, max_bytes: int,
+                    head_only: bool = False) -> requests.Response:
+    """
+    GET `url`, streaming at most max_bytes of body (or only up to </head>),
+    revalidating against the session's http_cache (if any).
+    Raises like Response.raise_for_status().
+    """
+    cache: Optional[HttpCache] = getattr(sess, "http_cache", None)
+    entry = cache.get(url) if cache else None
+    if entry and not usable(entry, max_bytes, head_only):
+        entry = None   # stored body is shorter than this caller needs
+    headers = {}
+    if entry:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    r = sess.get(url, timeout=timeout, allow_redirects=True, headers=headers, stream=True)
+    if r.status_code == 304 and entry:
+        r.close()
+        cache.touch(url, r)
+        cache.note("revalidated", saved=len(entry["body"]))
+        out = cached_response(entry, r)
+        out._content = out._content[:max_bytes]
+        return out
+    if r.status_code >= 400 or r.status_code == 304:
+        r.close()
+        r.raise_for_status()
+        raise requests.HTTPError(f"304 without a cached copy for {url}", response=r)
+    body, complete = read_capped(r, max_bytes, head_only)
+    r._content, r._content_consumed = body, True
+    r.encoding = sniff_encoding(r, body)
+    if cache:
+        cache.note("changed" if entry else "new")
+        cache.put(url, r, complete)
+    return r
+
+
+def body_scanned(sess: requests.Session, url: str) -> bool:
+    """Whether the session's http_cache (if any) saw `url` scanned in full recently."""
+    cache: Optional[HttpCache] = getattr(sess, "http_cache", None)
+    return bool(cache and url and cache.scanned(url))
+
+def mark_body_scanned(sess: requests.Session, url: str) -> None:
+    cache: Optional[HttpCache] = getattr(sess, "http_cache", None)
+    if cache and url:
+        cache.mark_scanned(url)
+
+
+def add_http_cache_args(parser) -> None:
+    parser.add_argument("--http-cache", type=str, default=str(DEFAULT_HTTP_CACHE_PATH),
+                        help="SQLite file of fetched pages revalidated with ETag/Last-Modified on later runs.")
+    parser.add_argument("--no-http-cache", action="store_true",
+                        help="Always download pages in full; do not read or write the HTTP cache.")
+    parser.add_argument("--rescan-days", type=float, default=DEFAULT_RESCAN_DAYS,
+                        help="Re-read a site's full page for blank Yes/no columns after this many days (0 = every run).")
+
+def http_cache_from_args(args) -> Optional[HttpCache]:
+    if getattr(args, "no_http_cache", False):
+        return None
+    return HttpCache(Path(getattr(args, "http_cache", DEFAULT_HTTP_CACHE_PATH)),
+                     getattr(args, "rescan_days", DEFAULT_RESCAN_DAYS))
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass keyword detection over page text.
+
+- A profile maps feature names to keyword tuples (the *_WORDS / SERVICES
+  sets of an enricher); all keywords go into one matcher, so a page is read
+  once however many features and keywords the profile holds
+- The matcher is an Aho-Corasick automaton when pyahocorasick is installed
+  (time linear in the text plus the occurrences found), else one compiled,
+  prefix-factored regex anchored on word starts
+- Matches are word-boundary aware: "bar" no longer fires on "barbecue",
+  nor "moh" on "mohammed". A keyword ending in a letter also matches its
+  plain plural ("wedding" → "weddings"); keywords starting or ending with
+  punctuation ("a/c", "wa.me/") are only guarded on their word-character
+  side. A keyword ending in "*" is a stem: "neuro*" matches "neurologist"
+- Overlapping keywords all count: "valet parking" also reports the
+  features of "valet" and "parking"
+"""
+
+from __future__ import annotations
+import re
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+Hits = Dict[str, int]   # feature → offset of its first keyword in the text
+
+STEM = "*"
+WORD_START = r"(?:(?<!\w)|(?!\w))"   # a keyword starts on a word edge, or with punctuation
+
+
+def is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+def bounded_at(lt: str, i: int, w: str, stem: bool = False) -> bool:
+    """Whether `w`, found at lt[i:], starts and (unless a stem) ends on word edges, plural allowed."""
+    if i and is_word_char(w[0]) and is_word_char(lt[i - 1]):
+        return False
+    end = i + len(w)
+    if stem or not is_word_char(w[-1]):
+        return True
+    ends = [end]
+    if "a" <= w[-1] <= "z":
+        if lt.startswith("s", end):
+            ends.append(end + 1)
+        elif lt.startswith("es", end):
+            ends.append(end + 2)
+    return any(e >= len(lt) or not is_word_char(lt[e]) for e in ends)
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Alternation of `words` factored by common prefix; longer words are tried first."""
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class KeywordProfile:
+    def __init__(self, features: Mapping[str, Iterable[str]]):
+        self.features: Dict[str, tuple] = {name: tuple(w.lower() for w in words if w)
+                                           for name, words in features.items()}
+        # (keyword without "*", is a stem) → features it reports
+        self._owners: Dict[Tuple[str, bool], List[str]] = {}
+        for name, words in self.features.items():
+            for w in words:
+                key = (w[:-1], True) if w.endswith(STEM) else (w, False)
+                owners = self._owners.setdefault(key, [])
+                if name not in owners:
+                    owners.append(name)
+        words = {w for w, _ in self._owners}
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for w in words:
+                self._automaton.add_word(w, w)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            # The regex reports the longest keyword at each word start; the
+            # shorter ones it begins with are checked from there
+            self._pattern = re.compile(WORD_START + "(?=(" + trie_pattern(words) + "))")
+            self._prefixes = {w: [p for p in words if w.startswith(p)] for w in words}
+
+    def _occurrences(self, lt: str) -> Iterator[Tuple[int, str]]:
+        """(offset, keyword) of every keyword occurrence that starts on a word edge (or anywhere)."""
+        if self._automaton is not None:
+            for end, w in self._automaton.iter(lt):
+                yield end - len(w) + 1, w
+        else:
+            for m in self._pattern.finditer(lt):
+                for w in self._prefixes[m.group(1)]:
+                    yield m.start(), w
+
+    def scan(self, lt: str) -> Hits:
+        """Features present in lowercase text `lt`, with the offset of their first keyword."""
+        hits: Hits = {}
+        # keyword → its (is a stem) variants not matched yet
+        pending: Dict[str, List[bool]] = {}
+        for w, stem in self._owners:
+            pending.setdefault(w, []).append(stem)
+        if not pending:
+            return hits
+        for i, w in self._occurrences(lt):
+            stems = pending.get(w)
+            if stems is None:
+                continue
+            for stem in list(stems):
+                if not bounded_at(lt, i, w, stem):
+                    continue
+                stems.remove(stem)
+                for name in self._owners[(w, stem)]:
+                    if i < hits.get(name, i + 1):
+                        hits[name] = i
+            if not stems:
+                del pending[w]
+                if not pending:
+                    break
+        return hits
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass <meta> / <link> / JSON-LD extractor.
+
+- One regex sweep over the page collects the attributes of every <meta> and
+  <link> tag and the body of every <script type="application/ld+json">;
+  comments and other <script>/<style> bodies are skipped whole
+- meta_desc, jsonld_blocks, find_icons and the og:image part of hero
+  detection read from this instead of a BeautifulSoup tree, so the DOM is
+  only built (Page.soup) when body heuristics actually run
+- Lookups mirror the selectors they replace: meta[name="description"] is an
+  exact match on the attribute, link[rel="icon"] an exact match on the whole
+  rel value, and the image_src link any rel token
+"""
+
+from __future__ import annotations
+import html, re
+from typing import Dict, List, Optional
+
+TOKENS = re.compile(
+    r"<!--.*?-->"
+    r"""|<(script|style)\b((?:[^>"']|"[^"]*"|'[^']*')*)>(.*?)</\1\s*>"""
+    r"""|<(meta|link)\b((?:[^>"']|"[^"]*"|'[^']*')*)>""",
+    re.I | re.S,
+)
+ATTR = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+
+Attrs = Dict[str, str]
+
+
+def parse_attrs(s: str) -> Attrs:
+    """Attribute string → {lowercased name: unescaped value}; a repeated name keeps the last value."""
+    out: Attrs = {}
+    for m in ATTR.finditer(s):
+        val = next((v for v in m.group(2, 3, 4) if v is not None), "")
+        out[m.group(1).lower()] = html.unescape(val)
+    return out
+
+
+class MetaScan:
+    def __init__(self, text: str):
+        self.metas: List[Attrs] = []
+        self.links: List[Attrs] = []
+        self.jsonld: List[str] = []   # raw JSON-LD script bodies, in page order
+        for m in TOKENS.finditer(text):
+            if m.group(1):
+                if m.group(1).lower() == "script" and parse_attrs(m.group(2)).get("type") == "application/ld+json":
+                    self.jsonld.append(m.group(3))
+            elif m.group(4):
+                (self.metas if m.group(4).lower() == "meta" else self.links).append(parse_attrs(m.group(5)))
+
+    def meta_content(self, attr: str, value: str) -> List[str]:
+        """content= of every <meta attr="value">, in page order."""
+        return [t.get("content", "") for t in self.metas if t.get(attr) == value]
+
+    def link_hrefs(self, rel: str) -> List[str]:
+        """href= of every <link> whose whole rel value is `rel`, in page order."""
+        return [t["href"] for t in self.links
+                if " ".join(t.get("rel", "").split()).lower() == rel and t.get("href")]
+
+    def first_link_with_rel(self, token: str) -> Optional[Attrs]:
+        """First <link> carrying `token` among its rel values."""
+        for t in self.links:
+            if token in t.get("rel", "").lower().split():
+                return t
+        return None
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Parse-once page model for the enrichers.
+
+- <meta>/<link>/JSON-LD come from a single regex pass (crawl.metascan),
+  which is all logo, meta description and og:image detection need
+- One BeautifulSoup tree per fetched page, built only when body heuristics
+  ask for it, with lxml when it is installed (several times faster than
+  html.parser on large pages) and html.parser otherwise
+- The visible text and its lowercase form are computed on first use and
+  shared by every detector, instead of each detector calling get_text()
+  and lower() again
+"""
+
+from __future__ import annotations
+from functools import cached_property
+from typing import Optional
+
+import requests
+from bs4 import BeautifulSoup
+
+from .metascan import MetaScan
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+
+class Page:
+    def __init__(self, html: str, url: str = ""):
+        self.url = url
+        self.html = html
+
+    @classmethod
+    def from_response(cls, r: Optional[requests.Response]) -> Optional["Page"]:
+        return cls(r.text, r.url) if r is not None else None
+
+    @cached_property
+    def meta(self) -> MetaScan:
+        return MetaScan(self.html)
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return BeautifulSoup(self.html, PARSER)
+
+    @cached_property
+    def text(self) -> str:
+        """Visible text (script/style contents excluded), whitespace-joined."""
+        return self.soup.get_text(" ", strip=True)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
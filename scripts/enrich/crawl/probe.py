@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Hero image probing shared by the enrichers.
+
+- Candidates are checked a few at a time, concurrently, with a Range request
+  for the first PROBE_BYTES only (servers that ignore Range are cut off after
+  as many bytes)
+- Pixel width/height come from the PNG, JPEG, WebP or GIF header in those
+  bytes, so a "photo" means real dimensions (PHOTO_MIN_WIDTH x
+  PHOTO_MIN_HEIGHT, not a thin strip), not merely >= 8 KB; the byte-size
+  rule is only the fallback when the format can't be read
+- (content type, total bytes, width, height) per URL is cached in SQLite
+  across runs, so the same og:image or CDN asset is probed once a month
+  rather than once per row per run
+"""
+
+from __future__ import annotations
+import sqlite3, struct, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import requests
+
+from .httpcache import CACHE_DIR
+
+DEFAULT_PROBE_CACHE_PATH = CACHE_DIR / "enrich_image_probe.sqlite"
+DEFAULT_PROBE_TTL_DAYS = 30.0
+PROBE_BYTES = 64 * 1024      # JPEG SOF usually sits after EXIF/ICC, well inside this
+PROBE_CHUNK = 4096           # reading stops at the first chunk that yields dimensions
+PROBE_TIMEOUT = 15
+PROBE_WORKERS = 4            # candidates probed at once per row
+MIN_BYTES = 8000             # fallback when dimensions are unknown (~8 KB; icons are smaller)
+PHOTO_MIN_WIDTH = 400
+PHOTO_MIN_HEIGHT = 200
+PHOTO_MAX_ASPECT = 4.0
+
+
+class Probe(NamedTuple):
+    content_type: str
+    bytes: Optional[int]
+    width: Optional[int]
+    height: Optional[int]
+
+
+# ───────────────────────── Header sniffing ─────────────────────────
+def sniff_type(head: bytes) -> Optional[str]:
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return None
+
+def jpeg_size(head: bytes) -> Optional[tuple]:
+    i = 2
+    while i + 9 < len(head):
+        if head[i] != 0xFF:
+            i += 1
+            continue
+        marker = head[i + 1]
+        if marker == 0xFF:                                   # fill byte
+            i += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:  # no length field
+            i += 2
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack(">HH", head[i + 5:i + 9])
+            return w, h
+        i += 2 + struct.unpack(">H", head[i + 2:i + 4])[0]
+    return None
+
+def image_size(head: bytes) -> Optional[tuple]:
+    """(width, height) from the first bytes of a PNG/JPEG/WebP/GIF, else None."""
+    try:
+        kind = sniff_type(head)
+        if kind == "image/png" and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if kind == "image/gif":
+            return struct.unpack("<HH", head[6:10])
+        if kind == "image/jpeg":
+            return jpeg_size(head)
+        if kind == "image/webp":
+            chunk = head[12:16]
+            if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+                w, h = struct.unpack("<HH", head[26:30])
+                return w & 0x3FFF, h & 0x3FFF
+            if chunk == b"VP8L" and head[20] == 0x2F:
+                b = int.from_bytes(head[21:25], "little")
+                return 1 + (b & 0x3FFF), 1 + ((b >> 14) & 0x3FFF)
+            if chunk == b"VP8X":
+                return (1 + int.from_bytes(head[24:27], "little"),
+                        1 + int.from_bytes(head[27:30], "little"))
+    except (struct.error, IndexError):
+        pass
+    return None
+
+
+# ───────────────────────── Verdicts ─────────────────────────
+def acceptable_content_type(ct: Optional[str]) -> bool:
+    """Bitmap images only; SVG and anything non-image are rejected."""
+    ct = (ct or "").lower().strip()
+    return ct.startswith("image/") and "svg" not in ct
+
+def photo_like(p: Optional[Probe]) -> bool:
+    if p is None or not acceptable_content_type(p.content_type):
+        return False
+    if p.width and p.height:
+        return (p.width >= PHOTO_MIN_WIDTH and p.height >= PHOTO_MIN_HEIGHT
+                and max(p.width / p.height, p.height / p.width) <= PHOTO_MAX_ASPECT)
+    return (p.bytes or 0) >= MIN_BYTES
+
+
+# ───────────────────────── Cache ─────────────────────────
+class ProbeCache:
+    def __init__(self, path: Path = DEFAULT_PROBE_CACHE_PATH, ttl_days: float = DEFAULT_PROBE_TTL_DAYS):
+        self.path = Path(path)
+        self.ttl_sec = max(0.0, float(ttl_days)) * 86400
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS probes ("
+            " url TEXT PRIMARY KEY,"
+            " content_type TEXT NOT NULL,"
+            " bytes INTEGER,"
+            " width INTEGER,"
+            " height INTEGER,"
+            " probed_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[Probe]:
+        cutoff = time.time() - self.ttl_sec if self.ttl_sec else 0.0
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_type, bytes, width, height FROM probes WHERE url = ? AND probed_at >= ?",
+                (url, cutoff)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return Probe(*row)
+
+    def put(self, url: str, p: Probe) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO probes (url, content_type, bytes, width, height, probed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)", (url, *p, time.time()))
+            self._db.commit()
+
+    def summary(self) -> str:
+        return f"{self.hits} cached, {self.misses} probed"
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# ───────────────────────── Prober ─────────────────────────
+def total_bytes(r: requests.Response) -> Optional[int]:
+    cr = r.headers.get("Content-Range", "")            # "bytes 0-65535/123456"
+    if "/" in cr and cr.rsplit("/", 1)[1].strip().isdigit():
+        return int(cr.rsplit("/", 1)[1])
+    cl = r.headers.get("Content-Length", "")
+    return int(cl) if r.status_code == 200 and cl.isdigit() else None
+
+def probe_url(sess: requests.Session, url: str, timeout: float = PROBE_TIMEOUT) -> Optional[Probe]:
+    """Probe one image URL over the network; None when it can't be fetched."""
+    try:
+        r = sess.get(url, timeout=timeout, allow_redirects=True, stream=True,
+                     headers={"Range": f"bytes=0-{PROBE_BYTES - 1}"})
+        head, size = bytearray(), None
+        try:
+            if r.status_code >= 400:
+                return None
+            for chunk in r.iter_content(PROBE_CHUNK):
+                head += chunk
+                size = image_size(bytes(head))
+                if size or len(head) >= PROBE_BYTES:
+                    break
+        finally:
+            r.close()
+    except Exception:
+        return None
+    ct = r.headers.get("Content-Type", "")
+    if not acceptable_content_type(ct):
+        ct = sniff_type(bytes(head)) or ct    # images served as octet-stream etc.
+    return Probe(ct, total_bytes(r), *(size or (None, None)))
+
+
+class ImageProber:
+    """Concurrent, cached probing of hero candidates through one session."""
+
+    def __init__(self, sess: requests.Session, cache: Optional[ProbeCache] = None,
+                 workers: int = PROBE_WORKERS):
+        self.sess = sess
+        self.cache = cache
+        self.batch = max(1, workers)
+        # Shared by every row worker; several rows may be probing at once
+        self._pool = ThreadPoolExecutor(max_workers=self.batch * 4) if self.batch > 1 else None
+        self._lock = threading.Lock()
+        self._seen: Dict[str, Optional[Probe]] = {}   # this run, failures included
+
+    def probe(self, url: str) -> Optional[Probe]:
+        with self._lock:
+            if url in self._seen:
+                return self._seen[url]
+        p = self.cache.get(url) if self.cache else None
+        if p is None:
+            p = probe_url(self.sess, url)
+            if p is not None and self.cache:
+                self.cache.put(url, p)
+        with self._lock:
+            self._seen[url] = p
+        return p
+
+    def probe_many(self, urls: Iterable[str]) -> List[Optional[Probe]]:
+        if self._pool is None:
+            return [self.probe(u) for u in urls]
+        return list(self._pool.map(self.probe, urls))
+
+    def first_photo(self, urls: List[str]) -> Optional[str]:
+        """First URL, in order, that is photo-like; probes `workers` at a time and stops at a hit."""
+        for i in range(0, len(urls), self.batch):
+            chunk = urls[i:i + self.batch]
+            for u, p in zip(chunk, self.probe_many(chunk)):
+                if photo_like(p):
+                    return u
+        return None
+
+    def first_image(self, urls: List[str]) -> Optional[str]:
+        """Last resort: first URL serving any bitmap image, whatever its size."""
+        for i in range(0, len(urls), self.batch):
+            chunk = urls[i:i + self.batch]
+            for u, p in zip(chunk, self.probe_many(chunk)):
+                if p is not None and acceptable_content_type(p.content_type):
+                    return u
+        return None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+
+def image_prober(sess: requests.Session) -> ImageProber:
+    """The session's shared prober (see polite_session), or an uncached sequential one."""
+    return getattr(sess, "image_prober", None) or ImageProber(sess, workers=1)
+
+
+def add_probe_args(parser) -> None:
+    parser.add_argument("--probe-cache", type=str, default=str(DEFAULT_PROBE_CACHE_PATH),
+                        help="SQLite file of image probe results (type, bytes, width, height) per URL.")
+    parser.add_argument("--no-probe-cache", action="store_true",
+                        help="Probe hero candidates afresh; do not read or write the probe cache.")
+
+def probe_cache_from_args(args) -> Optional[ProbeCache]:
+    if getattr(args, "no_probe_cache", False):
+        return None
+    return ProbeCache(Path(getattr(args, "probe_cache", DEFAULT_PROBE_CACHE_PATH)))
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent row runner for scripts/enrich/enrich_*.py.
+
+- Rows are enriched --workers at a time instead of one after another
+- Politeness is per host rather than a global sleep: every request made
+  through the shared session waits for a slot on its host (at most
+  --per-host in flight) and keeps --sleep seconds between request starts
+  on that host, so one slow business site never holds up Wikipedia or
+  Wikidata lookups for other rows
+- Wikimedia API hosts get their own limits (HOST_LIMITS)
+"""
+
+from __future__ import annotations
+import threading, time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .probe import ImageProber
+
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 2
+
+# host → (max requests in flight, min seconds between request starts)
+HOST_LIMITS: Dict[str, Tuple[int, float]] = {
+    "www.wikidata.org": (4, 0.1),
+    "en.wikipedia.org": (4, 0.1),
+    "www.en.wikipedia.org": (4, 0.1),
+    "commons.wikimedia.org": (4, 0.1),
+}
+
+Row = Dict[str, str]
+
+
+class HostLimiter:
+    """Per-host concurrency cap plus a minimum gap between request starts."""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST, interval: float = 0.0,
+                 overrides: Optional[Dict[str, Tuple[int, float]]] = None):
+        self.per_host = max(1, per_host)
+        self.interval = max(0.0, interval)
+        self.overrides = dict(HOST_LIMITS if overrides is None else overrides)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    def _limits(self, host: str) -> Tuple[int, float]:
+        return self.overrides.get(host, (self.per_host, self.interval))
+
+    @contextmanager
+    def slot(self, url: str):
+        host = (urlparse(url).hostname or "").lower()
+        limit, interval = self._limits(host)
+        with self._lock:
+            sem = self._slots.get(host)
+            if sem is None:
+                sem = self._slots[host] = threading.BoundedSemaphore(limit)
+        with sem:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class PoliteSession(requests.Session):
+    """requests.Session whose every request first takes a HostLimiter slot."""
+
+    def __init__(self, limiter: HostLimiter, pool_size: int = DEFAULT_WORKERS, http_cache=None):
+        super().__init__()
+        self.limiter = limiter
+        self.http_cache = http_cache   # crawl.httpcache.HttpCache used by conditional_get()
+        self.image_prober: Optional[ImageProber] = None
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        with self.limiter.slot(url):
+            return super().request(method, url, *args, **kwargs)
+
+
+def polite_session(headers: Dict[str, str], per_host: int = DEFAULT_PER_HOST, interval: float = 0.0,
+                   workers: int = DEFAULT_WORKERS, http_cache=None, probe_cache=None) -> PoliteSession:
+    sess = PoliteSession(HostLimiter(per_host, interval), pool_size=max(workers, 10) * 2, http_cache=http_cache)
+    sess.headers.update(headers)
+    sess.image_prober = ImageProber(sess, probe_cache)
+    return sess
+
+
+def enrich_rows(rows: List[Row], enrich_row: Callable[[requests.Session, Row], Row], sess: requests.Session,
+                workers: int = DEFAULT_WORKERS, skip: Optional[Callable[[Row], bool]] = None,
+                limit: int = 0) -> Tuple[int, int]:
+    """
+    Run enrich_row(sess, row) over the first `limit` rows (0 = all) on a thread
+    pool, replacing each row in place with its enriched copy (a row that raises
+    keeps what was filled before the error). Rows for which `skip` is true are
+    left alone. Returns (rows changed, rows skipped).
+    """
+    n = len(rows) if limit <= 0 else min(len(rows), limit)
+    todo = [i for i in range(n) if not (skip and skip(rows[i]))]
+
+    def one(i: int) -> Tuple[int, Row]:
+        row = dict(rows[i])
+        try:
+            row = enrich_row(sess, row) or row
+        except Exception:
+            pass
+        return i, row
+
+    updated = done = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for i, row in pool.map(one, todo):
+            if row != rows[i]:
+                rows[i] = row
+                updated += 1
+            done += 1
+            if done % 25 == 0:
+                print(f"[progress] {done}/{len(todo)} rows enriched…")
+    return updated, n - len(todo)
+
+
+def add_runner_args(ap) -> None:
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                    help="Rows enriched concurrently.")
+    ap.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                    help="Max requests in flight to any one website.")
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming body reads for page fetches.
+
+- The body is read in chunks and the connection closed as soon as max_bytes
+  have arrived, instead of downloading everything and trimming afterwards
+- head_only stops right after `</head>`: og:image, meta description,
+  JSON-LD in the head and icons are all there, so rows that only miss those
+  never pull the page body
+- The text encoding comes from the Content-Type charset, else the page's
+  <meta charset>, else UTF-8, so Response.text never runs charset detection
+  over the body
+"""
+
+from __future__ import annotations
+import codecs, re
+from typing import Optional, Tuple
+
+import requests
+
+CHUNK_BYTES = 16 * 1024
+HEAD_END = re.compile(rb"</head\s*>", re.I)
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.I)
+
+
+def read_capped(r: requests.Response, max_bytes: int, head_only: bool = False) -> Tuple[bytes, bool]:
+    """
+    Body of a stream=True response, at most max_bytes (or up to `</head>`).
+    Returns (body, complete); complete is False when reading stopped early.
+    Always closes the response.
+    """
+    buf = bytearray()
+    complete = True
+    try:
+        for chunk in r.iter_content(CHUNK_BYTES):
+            if not chunk:
+                continue
+            scan_from = max(0, len(buf) - 8)   # `</head >` may straddle two chunks
+            buf += chunk
+            if head_only:
+                m = HEAD_END.search(buf, scan_from)
+                if m and m.end() <= max_bytes:
+                    del buf[m.end():]
+                    complete = False
+                    break
+            if len(buf) > max_bytes:
+                del buf[max_bytes:]
+                complete = False
+                break
+    finally:
+        r.close()
+    return bytes(buf), complete
+
+
+def has_head(body: bytes) -> bool:
+    return HEAD_END.search(body) is not None
+
+
+def sniff_encoding(r: requests.Response, body: bytes) -> Optional[str]:
+    """Encoding for `body`: header charset, then <meta charset>, then UTF-8."""
+    if "charset=" in r.headers.get("Content-Type", "").lower():
+        return r.encoding
+    m = META_CHARSET.search(body[:4096])
+    if m:
+        name = m.group(1).decode("ascii", "ignore")
+        try:
+            codecs.lookup(name)
+            return name
+        except LookupError:
+            pass
+    return "utf-8"
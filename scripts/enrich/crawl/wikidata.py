@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Batched, cached Wikidata lookups for the enrichers.
+
+- Known QIDs (the CSV's wikidata_id column) and the QIDs that name
+  searches find are prefetched up front with wbgetentities, 50 per request,
+  instead of one Special:EntityData fetch per row; a QID that only turns
+  up later in the run is fetched on demand
+- name → QID searches (wbsearchentities) and QID → P18 file name are kept
+  in SQLite across runs, misses included, so a run only asks Wikidata
+  about names and entities it has not seen within the TTL
+- Safe to share across the enrichment worker threads
+"""
+
+from __future__ import annotations
+import re, sqlite3, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from .httpcache import CACHE_DIR
+
+WD_API = "https://www.wikidata.org/w/api.php"
+DEFAULT_WIKIDATA_CACHE_PATH = CACHE_DIR / "enrich_wikidata.sqlite"
+DEFAULT_WIKIDATA_TTL_DAYS = 30.0
+BATCH = 50                   # wbgetentities limit for anonymous clients
+TIMEOUT = 25
+QID = re.compile(r"^Q[1-9]\d*$")
+
+
+def commons_file_url(file_name: str) -> str:
+    return f"https://commons.wikimedia.org/wiki/Special:FilePath/{file_name.replace(' ', '_')}"
+
+def p18_of(entity: Dict) -> str:
+    """First P18 (image) file name of a wbgetentities entity, '' if none."""
+    try:
+        return str(entity["claims"]["P18"][0]["mainsnak"]["datavalue"]["value"])
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+
+# ───────────────────────── Cache ─────────────────────────
+class WikidataCache:
+    def __init__(self, path: Path = DEFAULT_WIKIDATA_CACHE_PATH, ttl_days: float = DEFAULT_WIKIDATA_TTL_DAYS):
+        self.path = Path(path)
+        self.ttl_sec = max(0.0, float(ttl_days)) * 86400
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS searches ("
+            " query TEXT PRIMARY KEY,"
+            " qid TEXT NOT NULL,"        # '' = no match
+            " searched_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            " qid TEXT PRIMARY KEY,"
+            " p18 TEXT NOT NULL,"        # Commons file name, '' = no P18
+            " fetched_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_sec if self.ttl_sec else 0.0
+
+    def _get(self, sql: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(sql, (key, self._cutoff())).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def get_search(self, query: str) -> Optional[str]:
+        return self._get("SELECT qid FROM searches WHERE query = ? AND searched_at >= ?", query)
+
+    def get_image(self, qid: str) -> Optional[str]:
+        return self._get("SELECT p18 FROM images WHERE qid = ? AND fetched_at >= ?", qid)
+
+    def put_search(self, query: str, qid: str) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO searches (query, qid, searched_at) VALUES (?, ?, ?)",
+                             (query, qid, time.time()))
+            self._db.commit()
+
+    def put_images(self, p18s: Dict[str, str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO images (qid, p18, fetched_at) VALUES (?, ?, ?)",
+                                 [(q, f, now) for q, f in p18s.items()])
+            self._db.commit()
+
+    def summary(self) -> str:
+        return f"{self.hits} cached, {self.misses} looked up"
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# ───────────────────────── Client ─────────────────────────
+class WikidataClient:
+    def __init__(self, sess: requests.Session, cache: Optional[WikidataCache] = None):
+        self.sess = sess
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._qids: Dict[str, str] = {}    # this run: search → QID ('' = none)
+        self._p18: Dict[str, str] = {}     # this run: QID → file name ('' = none)
+        self.requests = 0
+
+    def _api(self, params: Dict[str, str]) -> Optional[Dict]:
+        with self._lock:
+            self.requests += 1
+        try:
+            r = self.sess.get(WD_API, params={"format": "json", **params}, timeout=TIMEOUT)
+            return r.json() if r.ok else None
+        except (requests.RequestException, ValueError):
+            return None
+
+    def qid(self, name: str, city: str) -> Optional[str]:
+        """Best wbsearchentities match for "name city", or None."""
+        query = f"{name} {city}".strip()
+        key = query.lower()
+        with self._lock:
+            if key in self._qids:
+                return self._qids[key] or None
+        qid = self.cache.get_search(key) if self.cache else None
+        if qid is None:
+            j = self._api({"action": "wbsearchentities", "language": "en", "search": query,
+                           "type": "item", "limit": "1"})
+            if j is None:
+                return None                # transient failure: not remembered
+            hits = j.get("search") or []
+            qid = (hits[0].get("id") or "") if hits else ""
+            if self.cache:
+                self.cache.put_search(key, qid)
+        with self._lock:
+            self._qids[key] = qid
+        return qid or None
+
+    def search(self, pairs: Iterable[Tuple[str, str]], workers: int = 4) -> List[str]:
+        """QIDs of (name, city) pairs via qid(), `workers` at a time; '' where none found."""
+        pairs = list(pairs)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            return [q or "" for q in pool.map(lambda nc: self.qid(*nc), pairs)]
+
+    def prefetch(self, qids: Iterable[str]) -> None:
+        """Load P18 for every QID not yet known, BATCH ids per wbgetentities call."""
+        todo: List[str] = []
+        for q in dict.fromkeys(q.strip().upper() for q in qids if q):
+            if not QID.match(q):
+                continue
+            with self._lock:
+                if q in self._p18:
+                    continue
+            f = self.cache.get_image(q) if self.cache else None
+            if f is not None:
+                with self._lock:
+                    self._p18[q] = f
+            else:
+                todo.append(q)
+        for i in range(0, len(todo), BATCH):
+            chunk = todo[i:i + BATCH]
+            j = self._api({"action": "wbgetentities", "ids": "|".join(chunk), "props": "claims"})
+            if j is None or "entities" not in j:
+                continue
+            got: Dict[str, str] = {}
+            for key, ent in j["entities"].items():
+                # a redirected id comes back under its target, with the original in "redirects"
+                asked = (ent.get("redirects") or {}).get("from") or key
+                got[asked] = "" if "missing" in ent else p18_of(ent)
+            got = {q: f for q, f in got.items() if q in chunk}
+            with self._lock:
+                self._p18.update(got)
+            if self.cache and got:
+                self.cache.put_images(got)
+
+    def main_image(self, qid: str) -> Optional[str]:
+        """Commons URL of the entity's P18 image, or None."""
+        q = (qid or "").strip().upper()
+        if not QID.match(q):
+            return None
+        with self._lock:
+            known = q in self._p18
+        if not known:
+            self.prefetch([q])
+        with self._lock:
+            f = self._p18.get(q)
+        return commons_file_url(f) if f else None
+
+    def summary(self) -> str:
+        return f"{self.requests} API requests"
+
+
+def wikidata_client(sess: requests.Session) -> WikidataClient:
+    """The session's shared client (set by the enricher's main), or an uncached one."""
+    return getattr(sess, "wikidata", None) or WikidataClient(sess)
+
+
+def add_wikidata_args(parser) -> None:
+    parser.add_argument("--wikidata-cache", type=str, default=str(DEFAULT_WIKIDATA_CACHE_PATH),
+                        help="SQLite file of Wikidata name searches and P18 images.")
+    parser.add_argument("--no-wikidata-cache", action="store_true",
+                        help="Query Wikidata afresh; do not read or write the Wikidata cache.")
+
+def wikidata_cache_from_args(args) -> Optional[WikidataCache]:
+    if getattr(args, "no_wikidata_cache", False):
+        return None
+    return WikidataCache(Path(getattr(args, "wikidata_cache", DEFAULT_WIKIDATA_CACHE_PATH)))
@@ -27,6 +27,14 @@ from typing import Optional, Dict, Any, List, Tuple
 import requests
 from bs4 import BeautifulSoup
 
+from crawl.httpcache import (add_http_cache_args, body_scanned, conditional_get, http_cache_from_args,
+                             mark_body_scanned)
+from crawl.keywords import Hits, KeywordProfile
+from crawl.metascan import MetaScan
+from crawl.page import Page
+from crawl.probe import add_probe_args, image_prober, probe_cache_from_args
+from crawl.runner import DEFAULT_PER_HOST, DEFAULT_WORKERS, add_runner_args, enrich_rows, polite_session
+
 # ---------- Config ----------
 HEADERS = {
     "User-Agent": "BestMuscatBot/1.1 (+https://bestmuscat.com/; admin@bestmuscat.com)"
@@ -38,6 +46,7 @@ MAX_BYTES = 1_000_000  # keep parsing cheap
 
 # ---------- Small utils ----------
 def clean(s): return (s or "").strip()
+def is_closed(row): return clean(row.get("business_status")).upper() == "CLOSED_PERMANENTLY"
 def is_http(u: Optional[str]) -> bool:
     return isinstance(u, str) and u.lower().startswith(("http://", "https://"))
 
@@ -53,19 +62,17 @@ def domain_root(url: str) -> Optional[str]:
     except Exception:
         return None
 
-def session_with_retries() -> requests.Session:
-    s = requests.Session()
-    s.headers.update(HEADERS)
-    return s
+def session_with_retries(per_host: int = DEFAULT_PER_HOST, interval: float = PAUSE,
+                         workers: int = DEFAULT_WORKERS, http_cache=None,
+                         probe_cache=None) -> requests.Session:
+    return polite_session(HEADERS, per_host, interval, workers, http_cache, probe_cache)
 
-def fetch(sess: requests.Session, url: str) -> Optional[requests.Response]:
+def fetch(sess: requests.Session, url: str, head_only: bool = False) -> Optional[requests.Response]:
     if not is_http(url): return None
     for attempt in range(RETRIES + 1):
         try:
-            r = sess.get(url, timeout=TIMEOUT, allow_redirects=True)
-            r.raise_for_status()
-            r._content = r.content[:MAX_BYTES]   # trim so we don't parse entire pages
-            return r
+            # Streams at most MAX_BYTES (or just the <head>); unchanged pages come from the HTTP cache
+            return conditional_get(sess, url, TIMEOUT, MAX_BYTES, head_only)
         except Exception:
             if attempt >= RETRIES:
                 return None
@@ -73,11 +80,11 @@ def fetch(sess: requests.Session, url: str) -> Optional[requests.Response]:
     return None
 
 # ---------- HTML / JSON-LD helpers ----------
-def jsonld_blocks(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+def jsonld_blocks(meta: MetaScan) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
-    for tag in soup.find_all("script", {"type": "application/ld+json"}):
+    for raw in meta.jsonld:
         try:
-            data = json.loads(tag.string or "")
+            data = json.loads(raw)
             if isinstance(data, list):
                 out.extend([d for d in data if isinstance(d, dict)])
             elif isinstance(data, dict):
@@ -105,11 +112,10 @@ def first_clinic_like(ldjson_list: List[Dict[str, Any]]) -> Optional[Dict[str, A
                 if tt in pref: return node
     return None
 
-def meta_desc(soup: BeautifulSoup) -> Optional[str]:
-    for sel, key in (('meta[name="description"]', "content"),
-                     ('meta[property="og:description"]', "content")):
-        for tag in soup.select(sel):
-            val = clean(tag.get(key))
+def meta_desc(meta: MetaScan) -> Optional[str]:
+    for attr, key in (("name", "description"), ("property", "og:description")):
+        for val in meta.meta_content(attr, key):
+            val = clean(val)
             if val: return val
     return None
 
@@ -135,29 +141,6 @@ def looks_like_logo_or_icon(url: str) -> bool:
     u = url or ""
     return bool(LOGO_PAT.search(u) or SVG_OR_ICO_PAT.search(u) or SOCIAL_PIXEL_PAT.search(u))
 
-def acceptable_content_type(ct: Optional[str]) -> bool:
-    if not ct: return False
-    ct = ct.lower().strip()
-    if not ct.startswith("image/"): return False
-    if "svg" in ct: return False
-    return True
-
-def big_enough(bytes_len: Optional[int]) -> bool:
-    try:
-        return int(bytes_len or 0) >= 8000    # ~8KB minimum to avoid tiny icons
-    except Exception:
-        return False
-
-def fetch_head_like(sess: requests.Session, url: str) -> Tuple[Optional[str], Optional[int]]:
-    try:
-        r = sess.get(url, timeout=TIMEOUT, allow_redirects=True, stream=True)
-        ct = r.headers.get("Content-Type")
-        cl = r.headers.get("Content-Length")
-        r.close()
-        return (ct, int(cl) if cl and cl.isdigit() else None)
-    except Exception:
-        return (None, None)
-
 # Swap to your local stock if preferred (e.g., /assets/images/stock/*.webp)
 MUSCAT_STOCK = [
     "https://www.omanobserver.om/omanobserver/uploads/images/2024/06/25/2701550.jpg",
@@ -181,64 +164,67 @@ def select_from_srcset(attr: str) -> Optional[str]:
     except Exception:
         return None
 
-def find_site_hero_url(sess: requests.Session, soup: BeautifulSoup, base_url: str) -> Optional[str]:
+def find_site_hero_url(sess: requests.Session, page: Page, base_url: str) -> Optional[str]:
     metas: List[str] = []
     for name in ("property", "name"):
         for key in ("og:image", "twitter:image", "twitter:image:src"):
-            for tag in soup.find_all("meta", {name: key}):
-                val = clean(tag.get("content"))
+            for val in page.meta.meta_content(name, key):
+                val = clean(val)
                 if val:
                     metas.append(absolute(base_url, html.unescape(val)))
 
-    link_tag = soup.find("link", {"rel": "image_src"})
+    link_tag = page.meta.first_link_with_rel("image_src")
     if link_tag and link_tag.get("href"):
         metas.append(absolute(base_url, link_tag["href"].strip()))
 
-    candidates: List[str] = []
-    hero_words = ("hero", "banner", "header", "masthead", "slideshow", "carousel")
-    for img in soup.find_all("img"):
-        classes = " ".join(img.get("class") or []).lower()
-        alt = (img.get("alt") or "").lower()
-        attrs = " ".join([classes, alt])
-        if any(w in attrs for w in hero_words):
-            for key in ("data-src", "data-original", "data-lazy", "src", "data-url"):
-                val = img.get(key)
-                if val: candidates.append(val)
-            if img.get("srcset"):
-                ss = select_from_srcset(img["srcset"])
-                if ss: candidates.append(ss)
-
-    if not candidates:
+    def img_candidates() -> List[str]:
+        soup = page.soup
+        candidates: List[str] = []
+        hero_words = ("hero", "banner", "header", "masthead", "slideshow", "carousel")
         for img in soup.find_all("img"):
-            for key in ("data-src", "data-original", "src"):
-                val = img.get(key)
-                if val:
-                    candidates.append(val)
-                    break
-            if img.get("srcset"):
-                ss = select_from_srcset(img["srcset"])
-                if ss: candidates.append(ss)
-
-    all_cands, seen = [], set()
-    for href in [*metas, *candidates]:
-        if not href: continue
-        url = absolute(base_url, html.unescape(href.strip()))
-        if not is_http(url): continue
-        if url in seen: continue
-        seen.add(url)
-        all_cands.append(url)
-
-    filtered = [u for u in all_cands if not looks_like_logo_or_icon(u)]
-
-    for u in filtered:
-        ct, size = fetch_head_like(sess, u)
-        if acceptable_content_type(ct) and big_enough(size):
-            return u
-    for u in filtered:
-        ct, _ = fetch_head_like(sess, u)
-        if acceptable_content_type(ct):
-            return u
-    return None
+            classes = " ".join(img.get("class") or []).lower()
+            alt = (img.get("alt") or "").lower()
+            attrs = " ".join([classes, alt])
+            if any(w in attrs for w in hero_words):
+                for key in ("data-src", "data-original", "data-lazy", "src", "data-url"):
+                    val = img.get(key)
+                    if val: candidates.append(val)
+                if img.get("srcset"):
+                    ss = select_from_srcset(img["srcset"])
+                    if ss: candidates.append(ss)
+
+        if not candidates:
+            for img in soup.find_all("img"):
+                for key in ("data-src", "data-original", "src"):
+                    val = img.get(key)
+                    if val:
+                        candidates.append(val)
+                        break
+                if img.get("srcset"):
+                    ss = select_from_srcset(img["srcset"])
+                    if ss: candidates.append(ss)
+        return candidates
+
+    seen = set()
+    def filtered(hrefs: List[str]) -> List[str]:
+        out = []
+        for href in hrefs:
+            if not href: continue
+            url = absolute(base_url, html.unescape(href.strip()))
+            if not is_http(url): continue
+            if url in seen: continue
+            seen.add(url)
+            if not looks_like_logo_or_icon(url):
+                out.append(url)
+        return out
+
+    # <meta>/<link> candidates need no DOM; <img> tags are parsed only if none of them is photo-like
+    prober = image_prober(sess)
+    from_meta = filtered(metas)
+    hit = prober.first_photo(from_meta)
+    if hit: return hit
+    from_img = filtered(img_candidates())
+    return prober.first_photo(from_img) or prober.first_image(from_meta + from_img)
 
 # ---------- Clinic-specific detectors ----------
 BOOKING_WORDS = ("book", "appointment", "book now", "appointments", "reserve", "reservation")
@@ -252,6 +238,8 @@ SPECIALTY_WORDS = (
     "endocrinology","diabetes","radiology","imaging","lab","pathology","family medicine",
     "general practice","internal medicine","aesthetics","cosmetic","plastic surgery"
 )
+# Specialties matched as word stems ("neuro" → neurology, neurologist, neurosurgeon, …)
+SPECIALTY_STEMS = ("neuro",)
 
 INSURANCE_WORDS = ("insurance", "network", "providers", "accepted", "panel")
 TELEMED_WORDS = ("telemedicine", "telehealth", "online consultation", "video consult")
@@ -265,36 +253,33 @@ FEMALE_DR_WORDS = ("female doctor", "lady doctor", "female physicians", "women d
 LANG_WORDS = ("english", "arabic", "hindi", "urdu", "malayalam", "tamil", "tagalog")
 ACCREDIT_WORDS = ("jci", "jcaho", "iso 9001", "accredited", "dha", "moh", "oaci")
 
-def has_any(text: str, words: Tuple[str, ...] | List[str]) -> bool:
-    lt = text.lower()
-    return any(w.lower() in lt for w in words)
-
-def capture_languages(text: str) -> str:
-    got = [w.title() for w in LANG_WORDS if w in text.lower()]
-    return ";".join(sorted(set(got)))
-
-def capture_specialties(text: str) -> str:
-    hits = []
-    lt = text.lower()
-    for w in SPECIALTY_WORDS:
-        if w in lt:
-            hits.append(w.title())
-    return ";".join(sorted(set(hits)))
+# One pass over the page text answers every flag below (see crawl.keywords)
+FEATURES = KeywordProfile({
+    "telemedicine": TELEMED_WORDS,
+    "emergency": EMERGENCY_WORDS,
+    "pharmacy": PHARMACY_WORDS,
+    "lab_services": LAB_WORDS,
+    "radiology": RADIOLOGY_WORDS,
+    "wheelchair_access": WHEELCHAIR_WORDS,
+    "parking": PARKING_WORDS,
+    "female_doctors": FEMALE_DR_WORDS,
+    "insurance_accepted": INSURANCE_WORDS,
+    "accreditation": ACCREDIT_WORDS,
+    **{"lang:" + w: (w,) for w in LANG_WORDS},
+    **{"specialty:" + w: (w + "*" if w in SPECIALTY_STEMS else w,) for w in SPECIALTY_WORDS},
+})
+
+def capture_languages(hits: Hits) -> str:
+    return ";".join(sorted(w.title() for w in LANG_WORDS if "lang:" + w in hits))
+
+def capture_specialties(hits: Hits) -> str:
+    return ";".join(sorted(w.title() for w in SPECIALTY_WORDS if "specialty:" + w in hits))
 
 # ---------- Feature/Link helpers ----------
-def find_icons(soup: BeautifulSoup, base_url: str) -> Optional[str]:
+def find_icons(meta: MetaScan, base_url: str) -> Optional[str]:
     icons = []
-    for sel in [
-        ('link[rel="icon"]', "href"),
-        ('link[rel="shortcut icon"]', "href"),
-        ('link[rel="apple-touch-icon"]', "href"),
-        ('link[rel="apple-touch-icon-precomposed"]', "href"),
-        ('link[rel="mask-icon"]', "href"),
-    ]:
-        for tag in soup.select(sel[0]):
-            href = tag.get(sel[1])
-            if href:
-                icons.append(href.strip())
+    for rel in ["icon", "shortcut icon", "apple-touch-icon", "apple-touch-icon-precomposed", "mask-icon"]:
+        icons.extend(href.strip() for href in meta.link_hrefs(rel))
     for href in icons:
         absu = absolute(base_url, href)
         if is_http(absu):
@@ -340,23 +325,37 @@ def wikipedia_page_image(sess: requests.Session, name: str, city: str) -> Option
     return None
 
 # ---------- Enrichment per row ----------
+# Columns whose detectors read past </head>; once all are filled only the <head> is fetched
+BODY_FIELDS = (
+    "about_long", "hero_url", "price_range", "booking_url", "whatsapp_url", "patient_portal_url",
+)
+# Yes/blank and keyword-list columns: blank may just mean "not on the site", so a
+# full page scanned within --rescan-days counts as checked however many stay blank
+FLAG_FIELDS = (
+    "telemedicine", "emergency", "pharmacy", "lab_services", "radiology", "wheelchair_access",
+    "parking", "female_doctors", "languages", "specialties", "insurance_accepted",
+    "accreditation", "amenities",
+)
+
 def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
     site = clean(row.get("website") or row.get("url"))
-    page_resp = fetch(sess, site) if is_http(site) else None
-    soup = BeautifulSoup(page_resp.text, "html.parser") if page_resp else None
-    ld = jsonld_blocks(soup) if soup else []
+    head_only = all(clean(row.get(k)) for k in BODY_FIELDS) and (
+        all(clean(row.get(k)) for k in FLAG_FIELDS) or body_scanned(sess, site))
+    page_resp = fetch(sess, site, head_only) if is_http(site) else None
+    page = Page.from_response(page_resp)   # parsed once; text/lower shared by the detectors below
+    ld = jsonld_blocks(page.meta) if page else []
     clinic_ld = first_clinic_like(ld) if ld else None
 
     # logo_url
-    if not clean(row.get("logo_url")) and soup and page_resp is not None:
-        icon = find_icons(soup, page_resp.url)
+    if not clean(row.get("logo_url")) and page:
+        icon = find_icons(page.meta, page_resp.url)
         if is_http(icon):
             row["logo_url"] = icon
 
     # about_short / about_long
-    if (not clean(row.get("about_short")) or not clean(row.get("about_long"))) and soup:
-        md = meta_desc(soup) or ""
-        para = first_paragraph(soup) or ""
+    if (not clean(row.get("about_short")) or not clean(row.get("about_long"))) and page:
+        md = meta_desc(page.meta) or ""
+        para = first_paragraph(page.soup) or ""
         if not clean(row.get("about_short")) and md:
             row["about_short"] = clamp_text(md, 200)
         if not clean(row.get("about_long")):
@@ -370,8 +369,8 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
             row["price_range"] = clean(clinic_ld.get("priceRange"))
 
     # hero_url pipeline
-    if not clean(row.get("hero_url")) and soup and page_resp is not None:
-        site_hero = find_site_hero_url(sess, soup, page_resp.url)
+    if not clean(row.get("hero_url")) and page:
+        site_hero = find_site_hero_url(sess, page, page_resp.url)
         if is_http(site_hero) and not looks_like_logo_or_icon(site_hero):
             row["hero_url"] = site_hero
             row.setdefault("image_credit", "Official site")
@@ -392,21 +391,19 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
             row.setdefault("image_source_url", stock)
 
     # Links + features
-    if soup and page_resp is not None:
+    if page:
         base = page_resp.url
-        txt = soup.get_text(" ", strip=True)
-
         # Useful links
         if not clean(row.get("booking_url")):
-            bu = find_first_link_containing(soup, base, BOOKING_WORDS)
+            bu = find_first_link_containing(page.soup, base, BOOKING_WORDS)
             if is_http(bu): row["booking_url"] = bu
 
         if not clean(row.get("whatsapp_url")):
-            wu = find_first_link_containing(soup, base, WHATSAPP_WORDS)
+            wu = find_first_link_containing(page.soup, base, WHATSAPP_WORDS)
             if is_http(wu): row["whatsapp_url"] = wu
 
         if not clean(row.get("patient_portal_url")):
-            pu = find_first_link_containing(soup, base, PORTAL_WORDS)
+            pu = find_first_link_containing(page.soup, base, PORTAL_WORDS)
             if is_http(pu): row["patient_portal_url"] = pu
 
         # Heuristic flags
@@ -414,23 +411,23 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
             if not clean(row.get(field)) and cond:
                 row[field] = "Yes"
 
-        lt = txt.lower()
-        set_yes("telemedicine", has_any(lt, TELEMED_WORDS))
-        set_yes("emergency", has_any(lt, EMERGENCY_WORDS))
-        set_yes("pharmacy", has_any(lt, PHARMACY_WORDS))
-        set_yes("lab_services", has_any(lt, LAB_WORDS))
-        set_yes("radiology", has_any(lt, RADIOLOGY_WORDS))
-        set_yes("wheelchair_access", has_any(lt, WHEELCHAIR_WORDS))
-        set_yes("parking", has_any(lt, PARKING_WORDS))
-        set_yes("female_doctors", has_any(lt, FEMALE_DR_WORDS))
+        hits = FEATURES.scan(page.lower)
+        set_yes("telemedicine", "telemedicine" in hits)
+        set_yes("emergency", "emergency" in hits)
+        set_yes("pharmacy", "pharmacy" in hits)
+        set_yes("lab_services", "lab_services" in hits)
+        set_yes("radiology", "radiology" in hits)
+        set_yes("wheelchair_access", "wheelchair_access" in hits)
+        set_yes("parking", "parking" in hits)
+        set_yes("female_doctors", "female_doctors" in hits)
         if not clean(row.get("languages")):
-            langs = capture_languages(lt)
+            langs = capture_languages(hits)
             if langs: row["languages"] = langs
         if not clean(row.get("specialties")):
-            specs = capture_specialties(lt)
+            specs = capture_specialties(hits)
             if specs: row["specialties"] = specs
-        set_yes("insurance_accepted", has_any(lt, INSURANCE_WORDS))
-        if not clean(row.get("accreditation")) and has_any(lt, ACCREDIT_WORDS):
+        set_yes("insurance_accepted", "insurance_accepted" in hits)
+        if not clean(row.get("accreditation")) and "accreditation" in hits:
             row["accreditation"] = "Accredited"
 
         # Aggregate amenities if empty
@@ -455,6 +452,8 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
             if am:
                 row["amenities"] = ";".join(am)
 
+    if page and not head_only:
+        mark_body_scanned(sess, site)   # FLAG_FIELDS now checked
     return row
 
 # ---------- CLI ----------
@@ -464,9 +463,12 @@ def main():
     ap.add_argument("--csv", default="data/sources/clinics.csv",
                     help="Path to clinics CSV (will be updated in place).")
     ap.add_argument("--sleep", type=float, default=PAUSE,
-                    help="Pause between rows (seconds).")
+                    help="Minimum seconds between requests to the same host.")
     ap.add_argument("--limit", type=int, default=0,
                     help="Optional: process only first N rows (for testing).")
+    add_runner_args(ap)
+    add_http_cache_args(ap)
+    add_probe_args(ap)
     args = ap.parse_args()
 
     path = Path(args.csv)
@@ -492,19 +494,13 @@ def main():
             rows.append(r)
 
     # Enrich
-    sess = session_with_retries()
-    updated = 0
+    http_cache = http_cache_from_args(args)
+    probe_cache = probe_cache_from_args(args)
+    sess = session_with_retries(args.per_host, args.sleep, args.workers, http_cache, probe_cache)
     n = len(rows) if args.limit <= 0 else min(len(rows), args.limit)
-    for i in range(n):
-        row = rows[i]
-        try:
-            new_row = enrich_row(sess, row)
-            if new_row != row:
-                rows[i] = new_row
-                updated += 1
-        except Exception:
-            pass
-        time.sleep(args.sleep)
+    # closed rows: no site fetch, image probes or Wikidata for dead listings
+    updated, closed = enrich_rows(rows, enrich_row, sess, workers=args.workers,
+                                  skip=is_closed, limit=n)
 
     # Write back (keep original columns order + any new fields)
     out_fields = list(rows[0].keys()) if rows else fieldnames
@@ -514,7 +510,15 @@ def main():
         for r in rows:
             w.writerow(r)
 
-    print(f"Enrichment complete. Rows updated: {updated}/{n}")
+    print(f"Enrichment complete. Rows updated: {updated}/{n} "
+          f"(skipped {closed} permanently closed)")
+    if http_cache:
+        print(f"[http-cache] {http_cache.summary()}")
+        http_cache.close()
+    sess.image_prober.close()
+    if probe_cache:
+        print(f"[image-probe] {probe_cache.summary()}")
+        probe_cache.close()
 
 if __name__ == "__main__":
     main()
@@ -14,11 +14,20 @@ This version:
 from __future__ import annotations
 import csv, re, time, json, hashlib
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List
 import html
 import requests
 from bs4 import BeautifulSoup
 
+from crawl.httpcache import (add_http_cache_args, body_scanned, conditional_get, http_cache_from_args,
+                             mark_body_scanned)
+from crawl.keywords import Hits, KeywordProfile
+from crawl.metascan import MetaScan
+from crawl.page import Page
+from crawl.probe import add_probe_args, image_prober, probe_cache_from_args
+from crawl.runner import DEFAULT_PER_HOST, DEFAULT_WORKERS, add_runner_args, enrich_rows, polite_session
+from crawl.wikidata import WikidataClient, add_wikidata_args, wikidata_cache_from_args, wikidata_client
+
 # ----- Config -----
 HEADERS = {
     "User-Agent": "BestMuscatBot/1.1 (+https://bestmuscat.com/; admin@bestmuscat.com)"
@@ -39,6 +48,10 @@ def is_http(u: Optional[str]) -> bool:
 def clean(s: Any) -> str:
     return (s or "").strip()
 
+def is_closed(row: Dict[str, str]) -> bool:
+    """Google lists the place as permanently closed (business_status from fetch_*.py)."""
+    return clean(row.get("business_status")).upper() == "CLOSED_PERMANENTLY"
+
 def absolute(base: str, url: str) -> str:
     from urllib.parse import urljoin
     return urljoin(base, url)
@@ -51,21 +64,18 @@ def domain_root(url: str) -> Optional[str]:
     except Exception:
         return None
 
-def session_with_retries() -> requests.Session:
-    s = requests.Session()
-    s.headers.update(HEADERS)
-    return s
+def session_with_retries(per_host: int = DEFAULT_PER_HOST, interval: float = PAUSE,
+                         workers: int = DEFAULT_WORKERS, http_cache=None,
+                         probe_cache=None) -> requests.Session:
+    return polite_session(HEADERS, per_host, interval, workers, http_cache, probe_cache)
 
-def fetch(sess: requests.Session, url: str) -> Optional[requests.Response]:
+def fetch(sess: requests.Session, url: str, head_only: bool = False) -> Optional[requests.Response]:
     if not is_http(url):
         return None
     for attempt in range(RETRIES + 1):
         try:
-            r = sess.get(url, timeout=TIMEOUT, allow_redirects=True)
-            r.raise_for_status()
-            # Trim to reduce parsing cost; keep head + some body
-            r._content = r.content[:MAX_BYTES]
-            return r
+            # Streams at most MAX_BYTES (or just the <head>); unchanged pages come from the HTTP cache
+            return conditional_get(sess, url, TIMEOUT, MAX_BYTES, head_only)
         except Exception:
             if attempt >= RETRIES:
                 return None
@@ -74,11 +84,11 @@ def fetch(sess: requests.Session, url: str) -> Optional[requests.Response]:
 
 
 # ----- HTML extraction helpers -----
-def jsonld_blocks(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+def jsonld_blocks(meta: MetaScan) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
-    for tag in soup.find_all("script", {"type": "application/ld+json"}):
+    for raw in meta.jsonld:
         try:
-            data = json.loads(tag.string or "")
+            data = json.loads(raw)
             if isinstance(data, list):
                 out.extend([d for d in data if isinstance(d, dict)])
             elif isinstance(data, dict):
@@ -104,11 +114,10 @@ def first_hotel_like(ldjson_list: List[Dict[str, Any]]) -> Optional[Dict[str, An
             return obj
     return None
 
-def meta_desc(soup: BeautifulSoup) -> Optional[str]:
-    for sel in [('meta[name="description"]', "content"),
-                ('meta[property="og:description"]', "content")]:
-        for tag in soup.select(sel[0]):
-            val = clean(tag.get(sel[1]))
+def meta_desc(meta: MetaScan) -> Optional[str]:
+    for attr, key in [("name", "description"), ("property", "og:description")]:
+        for val in meta.meta_content(attr, key):
+            val = clean(val)
             if val:
                 return val
     return None
@@ -124,34 +133,36 @@ def clamp_text(s: str, maxlen: int) -> str:
     s = re.sub(r"\s+", " ", s).strip()
     return s if len(s) <= maxlen else s[:maxlen].rsplit(" ", 1)[0] + "…"
 
-def detect_star_from_text(txt: str) -> Optional[str]:
-    t = txt.lower()
-    m = re.search(r"(\d)\s*[-\s]?star", t)
+def detect_star_from_text(lt: str) -> Optional[str]:
+    m = re.search(r"(\d)\s*[-\s]?star", lt)
     if m:
         return m.group(1)
     words = {"five": "5", "four": "4", "three": "3"}
     for w, d in words.items():
-        if re.search(rf"\b{w}\s*[-\s]?star", t):
+        if re.search(rf"\b{w}\s*[-\s]?star", lt):
             return d
     return None
 
-def extract_amenities_from_text(txt: str) -> List[str]:
-    keys = {
-        "free wifi": ["free wifi", "complimentary wifi", "wi-fi", "internet"],
-        "pool": ["pool", "swimming pool", "infinity pool"],
-        "spa": ["spa", "sauna", "steam"],
-        "beach": ["private beach", "beach access", "beachfront"],
-        "parking": ["free parking", "parking available", "valet parking"],
-        "gym": ["gym", "fitness centre", "fitness center"],
-        "breakfast": ["free breakfast", "breakfast included", "buffet breakfast"],
-        "airport shuttle": ["airport shuttle", "airport transfer"],
-    }
-    found = set()
-    lt = txt.lower()
-    for label, cues in keys.items():
-        if any(c in lt for c in cues):
-            found.add(label)
-    return sorted(found)
+AMENITY_CUES = {
+    "free wifi": ["free wifi", "complimentary wifi", "wi-fi", "internet"],
+    "pool": ["pool", "swimming pool", "infinity pool"],
+    "spa": ["spa", "sauna", "steam"],
+    "beach": ["private beach", "beach access", "beachfront"],
+    "parking": ["free parking", "parking available", "valet parking"],
+    "gym": ["gym", "fitness centre", "fitness center"],
+    "breakfast": ["free breakfast", "breakfast included", "buffet breakfast"],
+    "airport shuttle": ["airport shuttle", "airport transfer"],
+}
+
+# Amenity labels plus the breakfast/parking flags, matched in one pass over the page text
+FEATURES = KeywordProfile({
+    **AMENITY_CUES,
+    "breakfast_included": ["breakfast included", "free breakfast", "complimentary breakfast"],
+    "parking_flag": ["free parking", "parking available", "valet parking"],
+})
+
+def extract_amenities_from_text(hits: Hits) -> List[str]:
+    return sorted(label for label in AMENITY_CUES if label in hits)
 
 
 # ----- Hero-quality filters & Muscat stock -----
@@ -167,32 +178,6 @@ def looks_like_logo_or_icon(url: str) -> bool:
         SOCIAL_PIXEL_PAT.search(u)
     )
 
-def acceptable_content_type(ct: Optional[str]) -> bool:
-    # Only accept bitmap images; reject vector/svg and anything non-image
-    if not ct: return False
-    ct = ct.lower().strip()
-    if not ct.startswith("image/"): return False
-    if "svg" in ct: return False
-    return True
-
-def big_enough(bytes_len: Optional[int]) -> bool:
-    # Heuristic: require at least ~8KB; social badges/icons are often tiny
-    try:
-        return int(bytes_len or 0) >= 8000
-    except Exception:
-        return False
-
-def fetch_head_like(sess: requests.Session, url: str) -> Tuple[Optional[str], Optional[int]]:
-    """Best-effort content-type and size without downloading too much."""
-    try:
-        r = sess.get(url, timeout=TIMEOUT, allow_redirects=True, stream=True)
-        ct = r.headers.get("Content-Type")
-        cl = r.headers.get("Content-Length")
-        r.close()
-        return (ct, int(cl) if cl and cl.isdigit() else None)
-    except Exception:
-        return (None, None)
-
 # Curated, safe-to-use Muscat stock images (replace with your own if you prefer)
 MUSCAT_STOCK = [
     # Wikimedia Commons originals (examples)
@@ -232,103 +217,96 @@ def select_from_srcset(attr: str) -> Optional[str]:
     except Exception:
         return None
 
-def find_site_hero_url(sess: requests.Session, soup: BeautifulSoup, base_url: str) -> Optional[str]:
+def find_site_hero_url(sess: requests.Session, page: Page, base_url: str) -> Optional[str]:
     """Return a 'photo-like' hero URL from the official site, rejecting logos/icons/pixels."""
     # 1) Meta tags first
     metas: List[str] = []
     for name in ("property", "name"):
         for key in ("og:image", "twitter:image", "twitter:image:src"):
-            for tag in soup.find_all("meta", {name: key}):
-                val = clean(tag.get("content"))
+            for val in page.meta.meta_content(name, key):
+                val = clean(val)
                 if val:
                     metas.append(absolute(base_url, html.unescape(val)))
 
     # 2) link[rel=image_src]
-    link_tag = soup.find("link", {"rel": "image_src"})
+    link_tag = page.meta.first_link_with_rel("image_src")
     if link_tag and link_tag.get("href"):
         metas.append(absolute(base_url, link_tag["href"].strip()))
 
-    # 3) Hero-ish <img> heuristics
-    candidates: List[str] = []
-    hero_words = ("hero", "banner", "header", "masthead", "slideshow", "carousel")
-    for img in soup.find_all("img"):
-        classes = " ".join(img.get("class") or []).lower()
-        alt = (img.get("alt") or "").lower()
-        attrs = " ".join([classes, alt])
-        if any(w in attrs for w in hero_words):
-            for key in ("data-src", "data-original", "data-lazy", "src", "data-url"):
-                val = img.get(key)
-                if val:
-                    candidates.append(val)
-            if img.get("srcset"):
-                ss = select_from_srcset(img["srcset"])
-                if ss:
-                    candidates.append(ss)
-
-    # 4) Fallback: first non-tiny image anywhere
-    if not candidates:
+    def img_candidates() -> List[str]:
+        soup = page.soup
+        # 3) Hero-ish <img> heuristics
+        candidates: List[str] = []
+        hero_words = ("hero", "banner", "header", "masthead", "slideshow", "carousel")
         for img in soup.find_all("img"):
-            for key in ("data-src", "data-original", "src"):
-                val = img.get(key)
-                if val:
-                    candidates.append(val)
-                    break
-            if img.get("srcset"):
-                ss = select_from_srcset(img["srcset"])
-                if ss:
-                    candidates.append(ss)
-
-    # Normalize & de-dup
-    all_cands, seen = [], set()
-    for href in [*metas, *candidates]:
-        if not href:
-            continue
-        url = absolute(base_url, html.unescape(href.strip()))
-        if not is_http(url):
-            continue
-        if url in seen:
-            continue
-        seen.add(url)
-        all_cands.append(url)
-
-    # Filter out obvious logos/icons/pixels by pattern
-    filtered = [u for u in all_cands if not looks_like_logo_or_icon(u)]
-
-    # Validate by MIME/size; pick the first "photo-like"
-    for u in filtered:
-        ct, size = fetch_head_like(sess, u)
-        if acceptable_content_type(ct) and big_enough(size):
-            return u
-
-    # Last resort: accept if MIME is image/* (non-SVG), even if size unknown
-    for u in filtered:
-        ct, _ = fetch_head_like(sess, u)
-        if acceptable_content_type(ct):
-            return u
-
-    return None
+            classes = " ".join(img.get("class") or []).lower()
+            alt = (img.get("alt") or "").lower()
+            attrs = " ".join([classes, alt])
+            if any(w in attrs for w in hero_words):
+                for key in ("data-src", "data-original", "data-lazy", "src", "data-url"):
+                    val = img.get(key)
+                    if val:
+                        candidates.append(val)
+                if img.get("srcset"):
+                    ss = select_from_srcset(img["srcset"])
+                    if ss:
+                        candidates.append(ss)
+
+        # 4) Fallback: first non-tiny image anywhere
+        if not candidates:
+            for img in soup.find_all("img"):
+                for key in ("data-src", "data-original", "src"):
+                    val = img.get(key)
+                    if val:
+                        candidates.append(val)
+                        break
+                if img.get("srcset"):
+                    ss = select_from_srcset(img["srcset"])
+                    if ss:
+                        candidates.append(ss)
+        return candidates
+
+    # Normalize & de-dup, then filter out obvious logos/icons/pixels by pattern
+    seen = set()
+    def filtered(hrefs: List[str]) -> List[str]:
+        out = []
+        for href in hrefs:
+            if not href:
+                continue
+            url = absolute(base_url, html.unescape(href.strip()))
+            if not is_http(url):
+                continue
+            if url in seen:
+                continue
+            seen.add(url)
+            if not looks_like_logo_or_icon(url):
+                out.append(url)
+        return out
+
+    # Validate by MIME and pixel size; pick the first "photo-like". Meta
+    # candidates need no DOM, so <img> tags are only parsed when none of them
+    # qualifies. Candidates are probed a few at a time (crawl.probe).
+    prober = image_prober(sess)
+    from_meta = filtered(metas)
+    hit = prober.first_photo(from_meta)
+    if hit:
+        return hit
+    from_img = filtered(img_candidates())
+    hit = prober.first_photo(from_img)
+    if hit:
+        return hit
+
+    # Last resort: accept if MIME is image/* (non-SVG), whatever its size
+    return prober.first_image(from_meta + from_img)
 
 
 # ----- Wikidata / Wikipedia fallbacks (FREE) -----
-WD_ENTITY = "https://www.wikidata.org/wiki/Special:EntityData/{qid}.json"
 WP_SEARCH = "https://en.wikipedia.org/w/api.php"
 WP_PAGEIMAGE = "https://www.en.wikipedia.org/w/api.php"
 
 def wikidata_main_image(sess: requests.Session, qid: str) -> Optional[str]:
-    if not qid:
-        return None
-    try:
-        r = sess.get(WD_ENTITY.format(qid=qid), timeout=TIMEOUT)
-        if r.status_code != 200:
-            return None
-        ent = next(iter(r.json().get("entities", {}).values()))
-        claims = ent.get("claims", {})
-        if "P18" in claims:
-            file_name = claims["P18"][0]["mainsnak"]["datavalue"]["value"]
-            return f"https://commons.wikimedia.org/wiki/Special:FilePath/{str(file_name).replace(' ', '_')}"
-    except Exception:
-        return None
-    return None
+    # P18 via the run's batched, cached client (prefetched in main)
+    return wikidata_client(sess).main_image(qid)
 
 def wikipedia_page_image(sess: requests.Session, name: str, city: str) -> Optional[str]:
     """Find a likely Wikipedia article then fetch its page image (original)."""
@@ -381,38 +359,12 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return round(2 * R * asin(sqrt(a)), 2)
 
 def wikidata_qid(sess: requests.Session, name: str, city: str) -> Optional[str]:
-    params = {
-        "action": "wbsearchentities",
-        "format": "json",
-        "language": "en",
-        "search": f"{name} {city}".strip(),
-        "type": "item",
-        "limit": 1,
-    }
-    try:
-        r = sess.get("https://www.wikidata.org/w/api.php", params=params, timeout=TIMEOUT)
-        if r.ok:
-            j = r.json()
-            hits = j.get("search") or []
-            if hits:
-                return hits[0].get("id")
-    except Exception:
-        return None
-    return None
+    return wikidata_client(sess).qid(name, city)
 
-def find_icons(soup: BeautifulSoup, base_url: str) -> Optional[str]:
+def find_icons(meta: MetaScan, base_url: str) -> Optional[str]:
     icons = []
-    for sel in [
-        ('link[rel="icon"]', "href"),
-        ('link[rel="shortcut icon"]', "href"),
-        ('link[rel="apple-touch-icon"]', "href"),
-        ('link[rel="apple-touch-icon-precomposed"]', "href"),
-        ('link[rel="mask-icon"]', "href"),
-    ]:
-        for tag in soup.select(sel[0]):
-            href = tag.get(sel[1])
-            if href:
-                icons.append(href.strip())
+    for rel in ["icon", "shortcut icon", "apple-touch-icon", "apple-touch-icon-precomposed", "mask-icon"]:
+        icons.extend(href.strip() for href in meta.link_hrefs(rel))
     for href in icons:
         absu = absolute(base_url, href)
         if is_http(absu):
@@ -422,6 +374,16 @@ def find_icons(soup: BeautifulSoup, base_url: str) -> Optional[str]:
         return root.rstrip("/") + "/favicon.ico"
     return None
 
+# Columns whose detectors read past </head>; once all are filled only the <head> is fetched
+BODY_FIELDS = (
+    "about_long", "hero_url", "price_range", "star_rating", "checkin_time", "checkout_time",
+)
+# Yes/blank and keyword-list columns: blank may just mean "not on the site", so a
+# full page scanned within --rescan-days counts as checked however many stay blank
+FLAG_FIELDS = (
+    "hotel_amenities", "amenities", "breakfast_included", "parking",
+)
+
 def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
     name = clean(row.get("name"))
     city = clean(row.get("city"))
@@ -430,22 +392,28 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
     latf = float(lat) if lat not in (None, "",) else None
     lngf = float(lng) if lng not in (None, "",) else None
 
+    # If an existing hero_url looks like a logo/icon/pixel, wipe it so we can refill
+    if clean(row.get("hero_url")) and looks_like_logo_or_icon(row["hero_url"]):
+        row["hero_url"] = ""
+
     site = clean(row.get("website") or row.get("url"))
-    page_resp = fetch(sess, site) if is_http(site) else None
-    soup = BeautifulSoup(page_resp.text, "html.parser") if page_resp else None
-    ld = jsonld_blocks(soup) if soup else []
+    head_only = all(clean(row.get(k)) for k in BODY_FIELDS) and (
+        all(clean(row.get(k)) for k in FLAG_FIELDS) or body_scanned(sess, site))
+    page_resp = fetch(sess, site, head_only) if is_http(site) else None
+    page = Page.from_response(page_resp)   # parsed once; text/lower shared by the detectors below
+    ld = jsonld_blocks(page.meta) if page else []
     hotel_ld = first_hotel_like(ld) if ld else None
 
     # logo_url
-    if not clean(row.get("logo_url")) and soup and page_resp is not None:
-        icon = find_icons(soup, page_resp.url)
+    if not clean(row.get("logo_url")) and page:
+        icon = find_icons(page.meta, page_resp.url)
         if is_http(icon):
             row["logo_url"] = icon
 
     # about_short / about_long
-    if (not clean(row.get("about_short")) or not clean(row.get("about_long"))) and soup:
-        md = meta_desc(soup) or ""
-        para = first_paragraph(soup) or ""
+    if (not clean(row.get("about_short")) or not clean(row.get("about_long"))) and page:
+        md = meta_desc(page.meta) or ""
+        para = first_paragraph(page.soup) or ""
         if not clean(row.get("about_short")) and md:
             row["about_short"] = clamp_text(md, 200)
         if not clean(row.get("about_long")):
@@ -453,6 +421,8 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
             if long_txt:
                 row["about_long"] = clamp_text(long_txt, 600)
 
+    hits = FEATURES.scan(page.lower) if page else {}
+
     # JSON-LD enrichments
     if hotel_ld:
         if not clean(row.get("price_range")) and hotel_ld.get("priceRange"):
@@ -478,8 +448,7 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
                     if nm:
                         amen.append(nm)
         amen = list(dict.fromkeys(amen))
-        page_text = soup.get_text(" ", strip=True) if soup else ""
-        amen_k = extract_amenities_from_text(page_text)
+        amen_k = extract_amenities_from_text(hits)
         amen_all = ";".join(sorted(set([*amen, *amen_k]))) if (amen or amen_k) else ""
         if amen_all:
             if not clean(row.get("hotel_amenities")):
@@ -488,30 +457,22 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
                 row["amenities"] = amen_all
 
     # star_rating fallback via text
-    if not clean(row.get("star_rating")) and soup:
-        sr_txt = detect_star_from_text(soup.get_text(" ", strip=True))
+    if not clean(row.get("star_rating")) and page:
+        sr_txt = detect_star_from_text(page.lower)
         if sr_txt:
             row["star_rating"] = sr_txt
 
     # breakfast_included / parking heuristics
-    if soup:
-        txt = soup.get_text(" ", strip=True).lower()
-        if not clean(row.get("breakfast_included")):
-            if ("breakfast included" in txt or "free breakfast" in txt or "complimentary breakfast" in txt):
-                row["breakfast_included"] = "Yes"
-        if not clean(row.get("parking")):
-            if ("free parking" in txt or "parking available" in txt or "valet parking" in txt):
-                row["parking"] = "Yes"
-
-    # If an existing hero_url looks like a logo/icon/pixel, wipe it so we can refill
-    if clean(row.get("hero_url")) and looks_like_logo_or_icon(row["hero_url"]):
-        row["hero_url"] = ""
+    if not clean(row.get("breakfast_included")) and "breakfast_included" in hits:
+        row["breakfast_included"] = "Yes"
+    if not clean(row.get("parking")) and "parking_flag" in hits:
+        row["parking"] = "Yes"
 
     # ----------------- HERO IMAGE PIPELINE -----------------
     if not clean(row.get("hero_url")):
         # (1) Official site meta/hero <img>
-        if soup and page_resp is not None:
-            site_hero = find_site_hero_url(sess, soup, page_resp.url)
+        if page:
+            site_hero = find_site_hero_url(sess, page, page_resp.url)
             if is_http(site_hero) and not looks_like_logo_or_icon(site_hero):
                 row["hero_url"] = site_hero
                 row.setdefault("image_credit", "Official site")
@@ -552,6 +513,8 @@ def enrich_row(sess: requests.Session, row: Dict[str, str]) -> Dict[str, str]:
     if not clean(row.get("distance_to_airport")) and (latf is not None and lngf is not None):
         row["distance_to_airport"] = str(haversine_km(latf, lngf, MCT_LAT, MCT_LNG))
 
+    if page and not head_only:
+        mark_body_scanned(sess, site)   # FLAG_FIELDS now checked
     return row
 
 
@@ -562,7 +525,11 @@ def main():
     ap.add_argument("--csv", default="data/sources/hotels.csv",
                     help="Path to hotels CSV (will be updated in place).")
     ap.add_argument("--sleep", type=float, default=PAUSE,
-                    help="Pause between rows (seconds).")
+                    help="Minimum seconds between requests to the same host.")
+    add_runner_args(ap)
+    add_http_cache_args(ap)
+    add_probe_args(ap)
+    add_wikidata_args(ap)
     args = ap.parse_args()
 
     path = Path(args.csv)
@@ -586,18 +553,21 @@ def main():
             rows.append(r)
 
     # Enrich
-    sess = session_with_retries()
-    updated = 0
-    for i, row in enumerate(rows, 1):
-        try:
-            new_row = enrich_row(sess, row)
-            if new_row != row:
-                updated += 1
-                rows[i-1] = new_row
-        except Exception:
-            # keep going on errors
-            pass
-        time.sleep(args.sleep)
+    http_cache = http_cache_from_args(args)
+    probe_cache = probe_cache_from_args(args)
+    sess = session_with_retries(args.per_host, args.sleep, args.workers, http_cache, probe_cache)
+    wd_cache = wikidata_cache_from_args(args)
+    sess.wikidata = WikidataClient(sess, wd_cache)
+    # P18 for every QID a row may need in one wbgetentities call per 50 rows, instead of a
+    # fetch per row: the CSV's wikidata_id, else the name search enrich_row would run
+    # (its result is then already known to the client)
+    need = [r for r in rows if not is_closed(r) and not clean(r.get("hero_url"))]
+    known = [clean(r.get("wikidata_id")) for r in need]
+    unknown = [(clean(r.get("name")), clean(r.get("city"))) for r in need
+               if not clean(r.get("wikidata_id")) and clean(r.get("name"))]
+    sess.wikidata.prefetch(known + sess.wikidata.search(unknown, workers=args.workers))
+    # closed rows: no site fetch, image probes or Wikidata for dead listings
+    updated, closed = enrich_rows(rows, enrich_row, sess, workers=args.workers, skip=is_closed)
 
     # Write back
     out_fields = list(rows[0].keys()) if rows else fieldnames
@@ -607,7 +577,19 @@ def main():
         for r in rows:
             w.writerow(r)
 
-    print(f"Enrichment complete. Rows updated: {updated}/{len(rows)}")
+    print(f"Enrichment complete. Rows updated: {updated}/{len(rows)} "
+          f"(skipped {closed} permanently closed)")
+    if http_cache:
+        print(f"[http-cache] {http_cache.summary()}")
+        http_cache.close()
+    sess.image_prober.close()
+    if probe_cache:
+        print(f"[image-probe] {probe_cache.summary()}")
+        probe_cache.close()
+    print(f"[wikidata] {sess.wikidata.summary()}"
+          + (f"; cache: {wd_cache.summary()}" if wd_cache else ""))
+    if wd_cache:
+        wd_cache.close()
 
 if __name__ == "__main__":
     main()
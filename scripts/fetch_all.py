@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fetch several categories in one pass via Google Places (image-free, low-cost).
+
+- Runs every selected fetcher's keyword plan in one process
+- Identical (keyword, type, center) searches from different categories are issued once
+- Each place_id gets at most one Details call per run and goes to the
+  categories its Places types name (a restaurant found by the catering
+  keywords is written to restaurants.csv); which searches found it only
+  decides between such categories, or when its types name none
+- Keywords and other defaults come from each fetch_*.py; the flags below
+  override them for every selected category
+
+Run (example):
+  export GOOGLE_MAPS_API_KEY=YOUR_KEY
+  python scripts/fetch_all.py --categories restaurants,catering,events --basic-only
+"""
+
+import os, sys, argparse, importlib
+
+from places.engine import add_engine_args, require_api_key, run_fetch
+
+# ───────────────────────── Basics ─────────────────────────
+API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")   # checked in main(); a local stand-in needs none
+
+# fetch_<name>.py modules that expose parse_cli(argv) and category(args)
+CATEGORIES = [
+    "restaurants", "hotels", "catering", "clinics", "events", "garages",
+    "home_maintenance", "malls", "moving", "schools", "spas",
+]
+
+# Flags passed through to every category's own parser when given here
+CATEGORY_VALUE_FLAGS = ["centers", "radius", "max_pages_per_query", "max_places"]
+CATEGORY_SWITCHES = ["basic_only", "no_favicons"]
+
+# ─────────────────────── CLI / Main ───────────────────────
+def parse_cli():
+    parser = argparse.ArgumentParser(
+        description="Fetch several categories in one pass, sharing Text Search and Details calls."
+    )
+    parser.add_argument("--categories", type=str, default=",".join(CATEGORIES),
+                        help="Comma-separated categories to fetch (fetch_<name>.py).")
+    parser.add_argument("--centers", type=str, default=None,
+                        help='Semicolon-separated "lat,lng" points for every category (default: each fetcher\'s own).')
+    parser.add_argument("--radius", type=int, default=None,
+                        help="Search radius per center in meters for every category.")
+    parser.add_argument("--max-pages-per-query", type=int, default=None,
+                        help="Max pages per (keyword,center) for every category.")
+    parser.add_argument("--max-places", type=int, default=None,
+                        help="Stop each category after N new unique places (default: each fetcher's own).")
+    parser.add_argument("--wall-timeout-sec", type=int, default=3600, help="Abort run after this many seconds.")
+
+    parser.add_argument("--basic-only", action="store_true",
+                        help="Request only core detail fields (cheapest)—no hours/editorial.")
+    parser.add_argument("--no-favicons", action="store_true",
+                        help="Do not include Google S2 favicon URL in logo_url.")
+    add_engine_args(parser)
+    return parser.parse_args()
+
+def category_argv(args):
+    """Arguments for each fetcher's own parse_cli(), so its defaults fill in the rest."""
+    argv = []
+    for attr in CATEGORY_VALUE_FLAGS:
+        v = getattr(args, attr)
+        if v is not None:
+            argv.append(f"--{attr.replace('_', '-')}={v}")
+    for attr in CATEGORY_SWITCHES:
+        if getattr(args, attr):
+            argv.append(f"--{attr.replace('_', '-')}")
+    return argv
+
+def main():
+    args = parse_cli()
+    api_key = require_api_key(API_KEY, args)
+
+    names = [c.strip() for c in args.categories.split(",") if c.strip()]
+    unknown = [n for n in names if n not in CATEGORIES]
+    if unknown:
+        print(f"ERROR: Unknown categories: {', '.join(unknown)} (choose from {', '.join(CATEGORIES)})",
+              file=sys.stderr)
+        sys.exit(2)
+
+    cats = []
+    for name in names:
+        mod = importlib.import_module(f"fetch_{name}")
+        cat = mod.category(mod.parse_cli(category_argv(args)))
+        print(f"[{name}] {len(cat.keywords)} keywords × {len(cat.centers)} centers "
+              f"(radius {cat.radius_m} m, max={cat.args.max_places}, basic_only={cat.args.basic_only})")
+        if args.incremental:
+            cat.seed()
+        cats.append(cat)
+
+    run_fetch(api_key, cats, args)
+
+    for cat in cats:
+        rows = cat.write()
+        print(f"Wrote {len(rows)} unique {cat.name} rows → {cat.target_csv}")
+    print("Note: hero_url intentionally left blank. Use enrichment/cache steps later to add images.")
+
+if __name__ == "__main__":
+    main()
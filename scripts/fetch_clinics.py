@@ -14,15 +14,14 @@ Run (example):
   python scripts/fetch_clinics.py --basic-only --max-places 150
 """
 
-import csv, os, time, requests, sys, re, json, argparse
+import csv, os, time, re, json, argparse
 from pathlib import Path
 from urllib.parse import urlparse
 
+from places.engine import Category, add_engine_args, require_api_key, run_fetch
+
 # ───────────────────────── Basics ─────────────────────────
-API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
-if not API_KEY:
-    print("ERROR: Set GOOGLE_MAPS_API_KEY in your environment.", file=sys.stderr)
-    sys.exit(1)
+API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")   # checked in main(); a local stand-in needs none
 
 ROOT = Path(__file__).resolve().parents[1]   # repo root (scripts/ under root)
 SRC_DIR = ROOT / "data" / "sources"
@@ -39,9 +38,6 @@ def slugify(s: str) -> str:
 def maps_place_url(place_id: str) -> str:
     return f"https://www.google.com/maps/place/?q=place_id:{place_id}"
 
-def is_maps_fallback(url: str) -> bool:
-    return (url or "").startswith("https://www.google.com/maps/place/?q=place_id:")
-
 def is_http_url(u: str) -> bool:
     try:
         scheme = urlparse(u).scheme.lower()
@@ -57,20 +53,6 @@ def price_level_to_symbols(level):
     except Exception:
         return ""
 
-def http_get(url, params=None, timeout=30, allow_redirects=True, max_retries=3, backoff=1.5):
-    """Robust GET with retries/backoff for Places endpoints."""
-    attempt = 0
-    while True:
-        try:
-            r = requests.get(url, params=params, timeout=timeout, allow_redirects=allow_redirects)
-            r.raise_for_status()
-            return r
-        except Exception:
-            attempt += 1
-            if attempt >= max_retries:
-                raise
-            time.sleep(backoff ** attempt)
-
 def favicon_url_for(site_url: str, size: int = 128) -> str:
     """Construct a Google S2 favicon URL (string only; no extra request here)."""
     try:
@@ -91,7 +73,7 @@ DEFAULT_HEADERS = [
     "place_id","osm_type","osm_id","wikidata_id",
     "description","price_range","about_short","about_long","amenities",
     "rating_overall","sub_service","sub_ambience","sub_value","sub_accessibility",
-    "review_count","review_source","review_insight","last_updated",
+    "review_count","review_source","review_insight","last_updated","business_status",
     # clinic-specific placeholders (for later enrichment)
     "specialties","insurance","appointment_url","emergency",
     "accepts_walkins","telemedicine","languages_spoken","parking"
@@ -116,71 +98,12 @@ def normalize_row(d, header_order):
         out[k] = d.get(k, "")
     return out
 
-def merge_rows(old, new):
-    """Fill blanks; prefer official website over Maps fallback; keep better review_count."""
-    merged = dict(old)
-    for k, v in new.items():
-        ov = merged.get(k, "")
-        if k == "website":
-            if (not ov) or is_maps_fallback(ov):
-                if v:
-                    merged[k] = v
-        elif k == "review_count":
-            try:
-                oi = int(ov) if str(ov).strip().isdigit() else -1
-                ni = int(v) if str(v).strip().isdigit() else -1
-                if ni > oi:
-                    merged[k] = v
-            except Exception:
-                if not ov and v:
-                    merged[k] = v
-        else:
-            if not ov and v:
-                merged[k] = v
-    return merged
-
-# ───────────────── Google Places wrappers ─────────────────
-def places_text_search(keyword: str, lat: float, lng: float, radius_m: int, page_token=None):
-    """
-    Text Search for clinics around a center point.
-
-    We constrain with type='doctor' (widely supported) to reduce noise,
-    while varying 'query' keywords to capture specialties (dental, physio, etc.).
-    """
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    if page_token:
-        params = {"pagetoken": page_token, "key": API_KEY}
-    else:
-        params = {
-            "query": keyword,
-            "type": "doctor",
-            "location": f"{lat},{lng}",
-            "radius": radius_m,
-            "key": API_KEY,
-        }
-    r = http_get(url, params=params, timeout=30)
-    return r.json()
-
-def place_details(place_id: str, basic_only: bool):
-    """
-    Request ONLY non-image fields to reduce cost. (No 'photos' requested.)
-    """
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
-    fields = [
-        "place_id","name","formatted_address","geometry/location",
-        "international_phone_number","website","url","business_status",
-        "current_opening_hours","editorial_summary","rating","user_ratings_total",
-        "price_level"
-    ]
-    if basic_only:
-        fields = [
-            "place_id","name","formatted_address","geometry/location",
-            "international_phone_number","website","url",
-            "rating","user_ratings_total","price_level"
-        ]
-    params = {"place_id": place_id, "fields": ",".join(fields), "key": API_KEY}
-    r = http_get(url, params=params, timeout=30)
-    return r.json()
+# ───────────────── Google Places query ─────────────────
+# We constrain with type='doctor' (widely supported) to reduce noise,
+# while varying 'query' keywords to capture specialties (dental, physio, etc.).
+PLACE_TYPE = "doctor"
+# Results carrying any of these types are clinics in a fetch_all.py run, whichever search found them
+ROUTE_TYPES = ("doctor", "dentist", "hospital", "physiotherapist")
 
 # ───────────────── Row builder ─────────────────
 def build_row(text_item: dict, details: dict, args, header_order):
@@ -249,6 +172,7 @@ def build_row(text_item: dict, details: dict, args, header_order):
         "review_source": "Google" if ratings_total else "",
         "review_insight": "",
         "last_updated": time.strftime("%Y-%m-%d"),
+        "business_status": (p.get("business_status") or "").strip(),
         # clinic-specific placeholders for later enrichment
         "specialties": "",
         "insurance": "",
@@ -262,97 +186,9 @@ def build_row(text_item: dict, details: dict, args, header_order):
     return normalize_row(row_full, header_order)
 
 # ─────────────────────── Fetch one (center, keyword) ───────────────────────
-def fetch_for_center_keyword(lat, lng, radius_m, keyword, rows_by_pid, args, header_order):
-    data = places_text_search(keyword, lat, lng, radius_m, page_token=None)
-    seen_tokens = set()
-    pages_fetched = 0
-    last_page_pids = set()
-
-    while True:
-        status = data.get("status")
-        if status not in ("OK", "ZERO_RESULTS"):
-            print(f"[{keyword}] TextSearch status: {status} {data.get('error_message','')}", file=sys.stderr)
-            break
-
-        results = data.get("results", []) or []
-        curr_page_pids = set()
-
-        for it in results:
-            pid = it.get("place_id")
-            if not pid:
-                continue
-            curr_page_pids.add(pid)
-
-            # Skip already-known PIDs to avoid repeated Details calls
-            if pid in rows_by_pid:
-                continue
-
-            time.sleep(args.details_throttle_sec)  # gentle on Details quota
-            det = place_details(pid, basic_only=args.basic_only)
-            if det.get("status") != "OK":
-                continue
-
-            p = det.get("result", {}) or {}
-            name = (p.get("name") or "").strip()
-            if not name:
-                continue
-
-            row = build_row(it, p, args, header_order)
-            if pid in rows_by_pid:
-                rows_by_pid[pid] = merge_rows(rows_by_pid[pid], row)
-            else:
-                rows_by_pid[pid] = row
-
-            if len(rows_by_pid) % 25 == 0:
-                print(f"[progress] {len(rows_by_pid)} unique places so far…")
-
-            if args.max_places and len(rows_by_pid) >= args.max_places:
-                print(f"[guard] Reached --max-places={args.max_places}; stopping this query.")
-                return
-
-        if curr_page_pids and curr_page_pids == last_page_pids:
-            print("[guard] Duplicate page detected; breaking pagination loop.")
-            break
-        last_page_pids = curr_page_pids
-
-        pages_fetched += 1
-        if args.max_pages_per_query and pages_fetched >= args.max_pages_per_query:
-            break
-
-        token = data.get("next_page_token")
-        if not token:
-            break
-        if token in seen_tokens:
-            print("[guard] Seen this next_page_token already; breaking to avoid loop.")
-            break
-        seen_tokens.add(token)
-
-        # Wait up to ~12s for token to mature
-        advanced = False
-        for _ in range(6):
-            time.sleep(2)
-            nxt = places_text_search(keyword, lat, lng, radius_m, page_token=token)
-            stat = nxt.get("status")
-            if stat == "OK":
-                data = nxt
-                advanced = True
-                break
-            elif stat in ("INVALID_REQUEST", "UNKNOWN_ERROR"):
-                continue
-            elif stat in ("OVER_QUERY_LIMIT", "REQUEST_DENIED"):
-                print(f"[warn] {stat} during pagination; stopping this query.")
-                advanced = False
-                break
-            else:
-                print(f"[warn] Pagination stopped with status={stat}")
-                advanced = False
-                break
-
-        if not advanced:
-            break
 
 # ─────────────────────── CLI / Main ───────────────────────
-def parse_cli():
+def parse_cli(argv=None):
     parser = argparse.ArgumentParser(
         description="Fetch Muscat clinics via Google Places with low-cost, image-free details."
     )
@@ -384,62 +220,37 @@ def parse_cli():
     parser.add_argument("--basic-only", action="store_true",
                         help="Request only core detail fields (cheapest)—no hours/editorial.")
     parser.add_argument("--details-throttle-sec", type=float, default=0.2,
-                        help="Sleep seconds between Place Details calls.")
+                        help="Legacy pacing: when --details-qps is not given, Details run at 1/this per second.")
 
     # Cosmetic (free) favicon string:
     parser.add_argument("--no-favicons", action="store_true",
                         help="Do not include Google S2 favicon URL in logo_url.")
-    return parser.parse_args()
+    add_engine_args(parser)
+    return parser.parse_args(argv)
+
+def category(args) -> Category:
+    """Query plan, row builder and output CSV for this category (also used by fetch_all.py)."""
+    # Preserve existing header order if CSV exists, else use default template
+    cat = Category("clinics", OUT_CSV,
+                   load_header_order_from_existing_csv(OUT_CSV) or DEFAULT_HEADERS,
+                   args, place_type=PLACE_TYPE, route_types=ROUTE_TYPES)
+    cat.build_row = lambda it, p: build_row(it, p, args, cat.header_order)
+    return cat
 
 def main():
     args = parse_cli()
-    start_ts = time.time()
-
-    # Decide the header order (existing CSV first, else default template)
-    header_order = load_header_order_from_existing_csv(OUT_CSV) or DEFAULT_HEADERS
-
-    keywords = [k.strip() for k in args.keywords.split(",") if k.strip()]
-    centers = []
-    for c in args.centers.split(";"):
-        try:
-            lat_s, lng_s = c.split(",")
-            centers.append((float(lat_s.strip()), float(lng_s.strip())))
-        except Exception:
-            pass
-    radius_m = int(args.radius)
-
-    print(f"Fetching clinics (image-free)… {len(keywords)} keywords × {len(centers)} centers "
-          f"(radius {radius_m} m, max={args.max_places}, basic_only={args.basic_only})")
-    rows_by_pid = {}
-    stop_all = False
-
-    for kw in keywords:
-        for (lat, lng) in centers:
-            if args.wall_timeout_sec and (time.time() - start_ts) > args.wall_timeout_sec:
-                print("[guard] Wall timeout reached; stopping…")
-                stop_all = True
-                break
-            if args.max_places and len(rows_by_pid) >= args.max_places:
-                stop_all = True
-                break
-            print(f"→ Query '{kw}' @ {lat:.3f},{lng:.3f}")
-            fetch_for_center_keyword(lat, lng, radius_m, kw, rows_by_pid, args, header_order)
-            if args.max_places and len(rows_by_pid) >= args.max_places:
-                stop_all = True
-                break
-        if stop_all:
-            break
-
-    rows = list(rows_by_pid.values())
-    rows.sort(key=lambda r: (r.get("name",""), r.get("city","")))
-
-    with OUT_CSV.open("w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=header_order)
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
-
-    print(f"Wrote {len(rows)} unique clinics → {OUT_CSV}")
+    api_key = require_api_key(API_KEY, args)
+    cat = category(args)
+
+    print(f"Fetching clinics (image-free)… {len(cat.keywords)} keywords × {len(cat.centers)} centers "
+          f"(radius {cat.radius_m} m, max={args.max_places}, basic_only={args.basic_only})")
+    if args.incremental:
+        cat.seed()
+    run_fetch(api_key, [cat], args)
+
+    rows = cat.write()
+
+    print(f"Wrote {len(rows)} unique clinics → {cat.target_csv}")
     print("Note: hero_url intentionally left blank. Use enrichment/cache steps later to add images.")
 
 if __name__ == "__main__":
@@ -54,8 +54,12 @@ def stub_html(canonical_url, redirect_url):
 def ensure_dir(p): pathlib.Path(p).mkdir(parents=True, exist_ok=True)
 def write(p, s): p.write_text(s, encoding="utf-8")
 
+def is_closed(it) -> bool:
+    # csv_to_tools already leaves these out; guard against older tools.json files
+    return (it.get("business_status") or "").upper() == "CLOSED_PERMANENTLY"
+
 def main():
-    items = json.loads(DATA.read_text(encoding="utf-8"))
+    items = [it for it in json.loads(DATA.read_text(encoding="utf-8")) if not is_closed(it)]
 
     # 1) Category stubs (based on primary category present in data)
     primary_cats = set()
@@ -91,6 +91,9 @@ def main():
         # only process online images; skip empty or already-local
         if not url or not is_http(url):
             continue
+        # no downloads for places Google lists as permanently closed
+        if (row.get("business_status") or "").strip().upper() == "CLOSED_PERMANENTLY":
+            continue
 
         base = ASSETS_DIR / slug  # base filename without extension
         orig_path = TMP_DIR / f"{slug}.orig"
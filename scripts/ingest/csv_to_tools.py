@@ -37,6 +37,9 @@ CATEGORY_ALIASES = {
     # add more synonyms if needed
 }
 
+# Google business_status values (kept by the fetchers)
+CLOSED_PERMANENTLY = "CLOSED_PERMANENTLY"
+
 REQUIRED = [
     "id","slug","name","category","tagline","tags",
     "neighborhood","address","city","country","lat","lng",
@@ -134,6 +137,10 @@ def row_to_item(r: Dict[str, str]) -> Dict[str, Any]:
     item["price_range"]   = (r.get("price_range")   or "").strip() or None
     item["busyness_hint"] = (r.get("busyness_hint") or "").strip() or None
     item["last_updated"]  = (r.get("last_updated")  or "").strip() or None
+    # Only unusual statuses are worth surfacing (e.g. CLOSED_TEMPORARILY)
+    status = (r.get("business_status") or "").strip().upper()
+    if status and status != "OPERATIONAL":
+        item["business_status"] = status
 
     # Arrays from semicolon-separated CSV cells (reuses your split_tags helper)
     am = split_tags(r.get("amenities", ""))
@@ -211,10 +218,15 @@ def build():
     rows = read_all_csvs()
     # merge by slug: last write wins
     merged: Dict[str, Dict[str, Any]] = OrderedDict()
+    closed = 0
     for r in rows:
         slug = (r.get("slug") or r.get("id") or "").strip()
         if not slug:
             continue
+        # Permanently closed places get no listing, page stub or sitemap entry
+        if (r.get("business_status") or "").strip().upper() == CLOSED_PERMANENTLY:
+            closed += 1
+            continue
         item = row_to_item(r)
         merged[slug] = item
 
@@ -222,7 +234,7 @@ def build():
     TOOLS_JSON.parent.mkdir(parents=True, exist_ok=True)
     with TOOLS_JSON.open("w", encoding="utf-8") as f:
         json.dump(out, f, ensure_ascii=False, indent=2)
-    print(f"Wrote {len(out)} items → {TOOLS_JSON}")
+    print(f"Wrote {len(out)} items → {TOOLS_JSON} (left out {closed} permanently closed)")
 
 if __name__ == "__main__":
     build()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Fetch-path benchmark against the local Places stand-in (no API key, no quota).
+
+Starts standin.py on a free port, runs one category fetcher's plan through
+the shared engine against it (no Details cache, journal or run report, a
+scratch budget ledger and plan DB, CSV untouched) and reports wall time and
+throughput. Arguments after `--` go to the fetcher's own CLI, so any engine
+flag can be compared; with --incremental the CSV's rows are seeded first,
+like the fetcher does, and only rows beyond them are counted.
+
+Run from scripts/:
+  python -m places.bench --category restaurants --token-delay 0.5 --latency-ms 40 \\
+      -- --max-places 300 --query-concurrency 4 --details-qps 0
+"""
+
+from __future__ import annotations
+import argparse, importlib, json, sys, tempfile, time
+from pathlib import Path
+
+from . import engine
+from .standin import add_standin_args, serve, standin_from_args
+
+
+def parse_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Places fetch path against the local stand-in.")
+    parser.add_argument("--category", type=str, default="restaurants", help="Fetcher to run (fetch_<name>.py).")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of timed runs.")
+    parser.add_argument("--json", action="store_true", help="Print one JSON result per run.")
+    add_standin_args(parser)
+    argv = list(sys.argv[1:] if argv is None else argv)
+    rest = []
+    if "--" in argv:
+        i = argv.index("--")
+        argv, rest = argv[:i], argv[i + 1:]
+    return parser.parse_args(argv), rest
+
+def run_once(mod, fetch_argv, standin) -> dict:
+    args = mod.parse_cli(fetch_argv)
+    cat = mod.category(args)
+    if args.incremental:
+        cat.seed()
+    seeded = len(cat.rows_by_pid)
+    before = dict(standin.requests)
+    t0 = time.perf_counter()
+    engine.run_fetch("offline", [cat], args)
+    elapsed = time.perf_counter() - t0
+    ts = standin.requests["textsearch"] - before["textsearch"]
+    det = standin.requests["details"] - before["details"]
+    rows = len(cat.rows_by_pid) - seeded
+    return {
+        "category": cat.name,
+        "rows": rows,
+        "seeded_rows": seeded,
+        "textsearch_requests": ts,
+        "details_requests": det,
+        "wall_sec": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 2) if elapsed else 0.0,
+        "requests_per_sec": round((ts + det) / elapsed, 2) if elapsed else 0.0,
+    }
+
+def main():
+    args, rest = parse_cli()
+    standin = standin_from_args(args)
+    server = serve(standin, "127.0.0.1", 0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    # The client waits as long as the stand-in makes tokens mature
+    engine.PAGE_TOKEN_DELAY_SEC = args.token_delay
+    mod = importlib.import_module(f"fetch_{args.category}")
+    fetch_argv = rest + ["--places-base-url", base, "--no-details-cache", "--no-journal", "--no-report"]
+    # Stand-in calls cost nothing: keep them out of the real budget ledger and yield history
+    scratch = tempfile.TemporaryDirectory()
+    if not any(a.startswith("--budget-ledger") for a in rest):
+        fetch_argv += ["--budget-ledger", str(Path(scratch.name) / "budget.sqlite")]
+    if not any(a.startswith("--plan-db") for a in rest):
+        fetch_argv += ["--plan-db", str(Path(scratch.name) / "plan.sqlite")]
+    results = []
+    try:
+        for i in range(max(1, args.repeat)):
+            res = run_once(mod, fetch_argv, standin)
+            results.append(res)
+            if args.json:
+                print(json.dumps(res))
+            else:
+                print(f"[bench] run {i + 1}: {res['rows']} rows in {res['wall_sec']}s "
+                      f"({res['rows_per_sec']} rows/s; {res['textsearch_requests']} textsearch + "
+                      f"{res['details_requests']} details = {res['requests_per_sec']} req/s)")
+    finally:
+        server.shutdown()
+        scratch.cleanup()
+    if len(results) > 1 and not args.json:
+        walls = sorted(r["wall_sec"] for r in results)
+        print(f"[bench] best {walls[0]}s, median {walls[len(walls) // 2]}s over {len(walls)} runs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent Place Details cache (SQLite).
+
+- Stores raw Details payloads keyed by (place_id, field set)
+- A cached payload also answers requests for any subset of its fields
+- Entries older than the TTL are ignored (and overwritten on the next fetch)
+- Safe to share across the engine's worker threads
+"""
+
+from __future__ import annotations
+import json, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+ROOT = Path(__file__).resolve().parents[2]   # repo root (scripts/places/ under root)
+CACHE_DIR = ROOT / "scripts" / "tmp" / "cache"
+DEFAULT_CACHE_PATH = CACHE_DIR / "places_details.sqlite"
+DEFAULT_TTL_DAYS = 30.0
+
+
+def field_key(fields: Iterable[str]) -> str:
+    """Canonical, order-independent key for a Details field list."""
+    return ",".join(sorted(set(fields)))
+
+
+class DetailsCache:
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttl_days: float = DEFAULT_TTL_DAYS):
+        self.path = Path(path)
+        self.ttl_sec = max(0.0, float(ttl_days)) * 86400
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS details ("
+            " place_id TEXT NOT NULL,"
+            " fields TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " PRIMARY KEY (place_id, fields))"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, place_id: str, fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Freshest unexpired payload whose field set covers `fields`, else None."""
+        wanted = set(fields)
+        cutoff = time.time() - self.ttl_sec if self.ttl_sec else 0.0
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT fields, payload FROM details WHERE place_id = ? AND fetched_at >= ?"
+                " ORDER BY fetched_at DESC",
+                (place_id, cutoff),
+            )
+            rows = cur.fetchall()
+        for fkey, payload in rows:
+            if wanted.issubset(fkey.split(",")):
+                try:
+                    data = json.loads(payload)
+                except Exception:
+                    continue
+                with self._lock:
+                    self.hits += 1
+                return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, place_id: str, fields: Iterable[str], payload: Dict[str, Any]) -> None:
+        """Store an OK Details response; failed lookups are never cached."""
+        if payload.get("status") != "OK":
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO details (place_id, fields, fetched_at, payload) VALUES (?, ?, ?, ?)",
+                (place_id, field_key(fields), time.time(), json.dumps(payload, ensure_ascii=False)),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,1131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared Google Places fetch engine for scripts/fetch_*.py.
+
+- One copy of the Text Search / Place Details wrappers and the pagination loop
+- Place Details for a page run concurrently on a bounded worker pool
+  (--details-concurrency caps the number of requests in flight)
+- Pagination is pipelined: Details for page N run while the token for page
+  N+1 matures, and --query-concurrency (keyword, center) queries overlap
+- Details payloads are served from a persistent SQLite cache when fresh
+- --textsearch-rows builds rows from Text Search items (plus the place's
+  existing CSV row) and asks Details only for the columns still missing,
+  by billing tier; rows missing nothing are never sent
+- --incremental seeds the run from the existing CSV so only unseen place_ids
+  cost a Details call, and rows the current keywords miss are kept
+- --adaptive-tiles subdivides saturated (keyword, center) searches (see tiling.py)
+- Progress is checkpointed to an append-only journal (see journal.py); an
+  interrupted run resumes from it without repeating paid requests
+- Every request passes a shared per-endpoint token bucket (see quota.py)
+  instead of a fixed per-call sleep, and is charged to a cross-run budget
+  ledger with daily/monthly caps (see ledger.py)
+- --plan-by-yield orders queries by their past new-place yield and skips
+  dead (keyword, center) pairs (see planner.py)
+- Each run writes a JSON report of per-query yield, latency and cost (see telemetry.py)
+- The base URL is configurable so runs can target the local stand-in
+  (standin.py), whose fixtures --record-fixtures captures from real runs
+- --refresh re-details the stalest existing rows (by last_updated, optionally
+  only those missing some columns) instead of searching
+- --shard i/N runs one deterministic slice of the plan into a partial CSV;
+  python -m places.shard merges the slices (see shard.py)
+- Category fetchers only supply their query type, row builder and output CSV
+  (a Category); fetch_all.py runs several in one pass with shared Details
+"""
+
+from __future__ import annotations
+import csv, json, os, sys, threading, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+import requests
+
+from .cache import DEFAULT_CACHE_PATH, DEFAULT_TTL_DAYS, DetailsCache, field_key
+from .journal import Journal, default_journal_path, query_id
+from .ledger import BudgetExceeded, BudgetLedger, add_ledger_args, ledger_from_args
+from .planner import YieldPlanner, add_planner_args, pair_key, planner_from_args
+from .quota import (DETAILS, FIELD_TIERS, TEXTSEARCH, CostMeter, QuotaTracker, add_quota_args,
+                    call_cost_usd, quota_from_args)
+from .shard import Shard, add_shard_args, in_shard, parse_shard, shard_csv, shard_label
+from .telemetry import RunReport, add_report_args, default_report_path
+from .tiling import TEXTSEARCH_RESULT_CEILING, Tile, add_tiling_args, child_tiles, root_tiles, should_split
+
+DEFAULT_PLACES_BASE_URL = "https://maps.googleapis.com/maps/api/place"
+# Point at a local stand-in (see standin.py) with PLACES_API_BASE_URL or --places-base-url
+PLACES_BASE_URL = os.getenv("PLACES_API_BASE_URL") or DEFAULT_PLACES_BASE_URL
+
+# Basic + contact + a bit of context — no photos.
+DETAILS_FIELDS = [
+    "place_id","name","formatted_address","geometry/location",
+    "international_phone_number","website","url","business_status",
+    "current_opening_hours","editorial_summary","rating","user_ratings_total",
+    "price_level"
+]
+# Even cheaper: just core basics (no editorial summary, no hours)
+DETAILS_FIELDS_BASIC = [
+    "place_id","name","formatted_address","geometry/location",
+    "international_phone_number","website","url","business_status",
+    "rating","user_ratings_total","price_level"
+]
+# Columns the engine fills for every category, added even under an older CSV header
+ENGINE_COLUMNS = ["business_status"]
+# --textsearch-rows: Text Search items already carry these, so a Details
+# request never needs to ask for them again
+TEXTSEARCH_FIELDS = {
+    "place_id","name","formatted_address","geometry/location","business_status",
+    "rating","user_ratings_total","price_level"
+}
+# Row column → the Details fields that fill it (only columns in a category's header count)
+COLUMN_FIELDS = {
+    "phone": ["international_phone_number"],
+    "website": ["website"],
+    "url": ["website"],
+    "hours_raw": ["current_opening_hours"],
+    "opening_hours_json": ["current_opening_hours"],
+    "description": ["editorial_summary"],
+    "tagline": ["editorial_summary"],
+}
+
+DEFAULT_DETAILS_CONCURRENCY = 6
+DEFAULT_QUERY_CONCURRENCY = 3
+
+# A next_page_token needs a couple of seconds before Google accepts it
+PAGE_TOKEN_DELAY_SEC = 2.0
+PAGE_TOKEN_ATTEMPTS = 6
+
+# A place type is either fixed, absent, or chosen per keyword
+PlaceType = Union[None, str, Callable[[str], Optional[str]]]
+# Places types too broad to say which category a result belongs to
+GENERIC_TYPES = {"point_of_interest", "establishment", "food", "store"}
+RowBuilder = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, str]]
+
+# One pooled session shared by all worker threads
+SESSION = requests.Session()
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+# Set by run_fetch() for the duration of a run (None = no cache / no limits)
+DETAILS_CACHE: Optional[DetailsCache] = None
+QUOTA: Optional[QuotaTracker] = None
+# Cross-run budget ledger (set by run_fetch; None with --no-budget-ledger)
+LEDGER: Optional[BudgetLedger] = None
+FIXTURES = None   # open file for --record-fixtures
+SEARCH_FIXTURE_STATUSES = ("OK", "ZERO_RESULTS")
+FIXTURES_LOCK = threading.Lock()
+
+
+# ──────────────────────── Utilities ───────────────────────
+def is_maps_fallback(url: str) -> bool:
+    return (url or "").startswith("https://www.google.com/maps/place/?q=place_id:")
+
+def merge_rows(old, new):
+    """
+    Fill blanks; prefer official website over Maps fallback; keep better review_count;
+    a known business_status always takes the newer value (places do close).
+    """
+    merged = dict(old)
+    for k, v in new.items():
+        ov = merged.get(k, "")
+        if k == "business_status":
+            if v:
+                merged[k] = v
+        elif k == "website":
+            if (not ov) or is_maps_fallback(ov):
+                if v:
+                    merged[k] = v
+        elif k == "review_count":
+            try:
+                oi = int(ov) if str(ov).strip().isdigit() else -1
+                ni = int(v) if str(v).strip().isdigit() else -1
+                if ni > oi:
+                    merged[k] = v
+            except Exception:
+                if not ov and v:
+                    merged[k] = v
+        else:
+            if not ov and v:
+                merged[k] = v
+    return merged
+
+def with_fresh_status(row: Dict[str, str], fresh: Dict[str, str]) -> Dict[str, str]:
+    """
+    For merge_rows(fresh, older) calls: the older row's business_status would
+    win there, but a status just fetched from Places is the one to keep.
+    """
+    if (fresh.get("business_status") or "").strip():
+        row["business_status"] = fresh["business_status"]
+    return row
+
+def parse_centers(spec: str) -> List[Tuple[float, float]]:
+    """Parse semicolon-separated "lat,lng" points; malformed entries are skipped."""
+    centers = []
+    for c in (spec or "").split(";"):
+        try:
+            lat_s, lng_s = c.split(",")
+            centers.append((float(lat_s.strip()), float(lng_s.strip())))
+        except Exception:
+            pass
+    return centers
+
+def row_key(row: Dict[str, str]) -> str:
+    """
+    rows_by_pid key for a CSV row. Fetched rows carry the place_id in 'id' even
+    when an older header has no place_id column; rows with neither get a
+    stable stand-in so they are still written back.
+    """
+    pid = (row.get("place_id") or "").strip() or (row.get("id") or "").strip()
+    if pid:
+        return pid
+    return "row:" + ((row.get("slug") or "").strip() or (row.get("name") or "").strip())
+
+def seed_rows_from_csv(path: Path, rows_by_pid: Dict[str, Dict[str, str]], header_order: List[str]) -> List[str]:
+    """
+    Load an existing category CSV into rows_by_pid (merging duplicates with merge_rows).
+    Returns the header to write back: the file's own column order, then any
+    template columns it is missing, so enrichment-only columns survive the rewrite.
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return list(header_order)
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        rdr = csv.DictReader(f)
+        header = [h for h in (rdr.fieldnames or []) if h]
+        for r in rdr:
+            row = {k: (v or "") for k, v in r.items() if k}
+            key = row_key(row)
+            if key == "row:":
+                continue
+            rows_by_pid[key] = merge_rows(rows_by_pid[key], row) if key in rows_by_pid else row
+    return header + [h for h in header_order if h not in header]
+
+def sort_rows(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Output order of every category CSV: name, city, then place_id for ties."""
+    return sorted(rows, key=lambda r: (r.get("name", ""), r.get("city", ""), row_key(r)))
+
+def write_csv(path: Path, header_order: List[str], rows: List[Dict[str, str]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=header_order)
+        w.writeheader()
+        for r in rows:
+            w.writerow(r)
+
+def record_fixture(endpoint: str, params: Optional[Dict[str, Any]], r) -> None:
+    """
+    Append one response to --record-fixtures in the stand-in's JSONL format (no
+    API key). Text Search pages are kept only once they answered: a page token
+    polled before it is ready (INVALID_REQUEST) or a transient error would
+    replay in place of the page and stall pagination.
+    """
+    try:
+        payload = r.json()
+    except Exception:
+        return
+    if endpoint == TEXTSEARCH and payload.get("status") not in SEARCH_FIXTURE_STATUSES:
+        return
+    rec = {"endpoint": endpoint,
+           "params": {k: v for k, v in (params or {}).items() if k != "key"},
+           "response": payload}
+    with FIXTURES_LOCK:
+        FIXTURES.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        FIXTURES.flush()
+
+def http_get(url, params=None, timeout=30, allow_redirects=True, max_retries=3, backoff=1.5,
+             endpoint: Optional[str] = None, fields=(), category: str = "",
+             meter: Optional[CostMeter] = None):
+    """
+    Robust GET with retries/backoff for Places endpoints.
+    With an `endpoint`, every attempt is first charged to `category` in the
+    budget ledger (BudgetExceeded if a cap forbids it; never retried), then
+    takes a token from that endpoint's bucket and is counted (in the quota and
+    in `meter`) once a response comes back.
+    """
+    attempt = 0
+    while True:
+        quota = QUOTA if endpoint else None
+        ledger = LEDGER if endpoint else None
+        try:
+            if ledger is not None:
+                ledger.charge(category or "-", endpoint, call_cost_usd(endpoint, fields))
+            if quota is not None:
+                quota.acquire(endpoint)
+            t0 = time.perf_counter()
+            r = SESSION.get(url, params=params, timeout=timeout, allow_redirects=allow_redirects)
+            if quota is not None:
+                quota.record(endpoint, fields, latency_sec=time.perf_counter() - t0)
+            if endpoint and meter is not None:
+                meter.add(endpoint, fields)
+            r.raise_for_status()
+            if endpoint and FIXTURES is not None:
+                record_fixture(endpoint, params, r)
+            return r
+        except BudgetExceeded:
+            raise
+        except Exception:
+            attempt += 1
+            if attempt >= max_retries:
+                raise
+            time.sleep(backoff ** attempt)
+
+
+# ───────────────── Google Places wrappers ─────────────────
+def resolve_place_type(place_type: PlaceType, keyword: str) -> Optional[str]:
+    if callable(place_type):
+        return place_type(keyword)
+    return place_type
+
+def places_text_search(api_key: str, keyword: str, lat: float, lng: float, radius_m: int,
+                       place_type: PlaceType = None, page_token=None, category: str = "",
+                       meter: Optional[CostMeter] = None):
+    """
+    Text Search around a center point.
+    When the category has a Places 'type', include it to reduce noise.
+    """
+    if page_token:
+        params = {"pagetoken": page_token, "key": api_key}
+    else:
+        params = {"query": keyword}
+        t = resolve_place_type(place_type, keyword)
+        if t:
+            params["type"] = t
+        params.update({
+            "location": f"{lat},{lng}",
+            "radius": radius_m,
+            "key": api_key,
+        })
+    r = http_get(f"{PLACES_BASE_URL}/textsearch/json", params=params, timeout=30, endpoint=TEXTSEARCH,
+                 category=category, meter=meter)
+    return r.json()
+
+def details_fields(basic_only: bool) -> List[str]:
+    return DETAILS_FIELDS_BASIC if basic_only else DETAILS_FIELDS
+
+def place_details(api_key: str, place_id: str, basic_only: bool, fields: Optional[List[str]] = None,
+                  category: str = "", cached: bool = True, meter: Optional[CostMeter] = None):
+    """
+    Request ONLY non-image fields to reduce cost. (No 'photos')
+    A fresh cached payload covering the same fields is returned without a request
+    (unless `cached` is False; the new payload is still stored).
+    """
+    fields = fields or details_fields(basic_only)
+    cache = DETAILS_CACHE
+    if cache is not None and cached:
+        hit = cache.get(place_id, fields)
+        if hit is not None:
+            return hit
+    params = {"place_id": place_id, "fields": ",".join(fields), "key": api_key}
+    r = http_get(f"{PLACES_BASE_URL}/details/json", params=params, timeout=30, endpoint=DETAILS, fields=fields,
+                 category=category, meter=meter)
+    data = r.json()
+    if cache is not None:
+        cache.put(place_id, fields, data)
+    return data
+
+def details_mask(row: Dict[str, str], header_order: List[str], basic_only: bool) -> List[str]:
+    """
+    Details fields for the columns `row` is still missing; [] when nothing is.
+    Once a billing tier is paid for, its other useful fields are added too,
+    since they cost nothing extra.
+    """
+    allowed = details_fields(basic_only)
+    wanted = set()
+    for col, fields in COLUMN_FIELDS.items():
+        if col not in header_order:
+            continue
+        v = (row.get(col) or "").strip()
+        if v and not (col in ("website", "url") and is_maps_fallback(v)):
+            continue
+        wanted.update(f for f in fields if f in allowed)
+    if not wanted:
+        return []
+    tiers = {FIELD_TIERS.get(f, "atmosphere") for f in wanted}
+    used = {f for fields in COLUMN_FIELDS.values() for f in fields}
+    wanted.update(f for f in allowed if f in used and FIELD_TIERS.get(f, "atmosphere") in tiers)
+    return ["place_id"] + [f for f in allowed if f in wanted and f not in TEXTSEARCH_FIELDS]
+
+def require_api_key(api_key: Optional[str], args) -> str:
+    """The key is only mandatory against Google itself; a local stand-in accepts any."""
+    if api_key:
+        return api_key
+    base = getattr(args, "places_base_url", None) or PLACES_BASE_URL
+    if base.rstrip("/") != DEFAULT_PLACES_BASE_URL:
+        return "offline"
+    print("ERROR: Set GOOGLE_MAPS_API_KEY in your environment.", file=sys.stderr)
+    sys.exit(1)
+
+def run_suffix(args) -> str:
+    """Distinguishes the default journal/report files of concurrent --shard runs."""
+    shard = parse_shard(getattr(args, "shard", None))
+    return f".{shard_label(shard)}" if shard else ""
+
+def open_journal(args, categories) -> Optional[Journal]:
+    if getattr(args, "no_journal", False):
+        return None
+    path = getattr(args, "journal", None) or default_journal_path([c.name for c in categories], run_suffix(args))
+    return Journal(Path(path), resume=not getattr(args, "restart", False))
+
+def open_details_cache(args) -> Optional[DetailsCache]:
+    if getattr(args, "no_details_cache", False):
+        return None
+    return DetailsCache(Path(getattr(args, "details_cache", DEFAULT_CACHE_PATH)),
+                        ttl_days=getattr(args, "details_cache_ttl_days", DEFAULT_TTL_DAYS))
+
+
+# ─────────────────────── Fetch loop ───────────────────────
+class Category:
+    """
+    One category's share of a fetch run: its keyword plan, Places type, row
+    builder and output CSV, plus the rows collected so far (keyed by place_id).
+    Per-category options (keywords, centers, --max-places, --basic-only, …) are
+    read from `args`; run-wide ones come from the args given to run_fetch().
+    """
+
+    def __init__(self, name: str, out_csv: Path, header_order: List[str], args,
+                 place_type: PlaceType = None, build_row: Optional[RowBuilder] = None,
+                 route_types: Optional[Iterable[str]] = None):
+        self.name = name
+        self.out_csv = Path(out_csv)
+        self.header_order = list(header_order) + [c for c in ENGINE_COLUMNS if c not in header_order]
+        self.args = args
+        self.place_type = place_type
+        self.build_row = build_row
+        # Places types that make a result this category's in a multi-category run
+        # (default: its own type, unless generic); see FetchRun._route
+        if route_types is None:
+            route_types = [place_type] if isinstance(place_type, str) else []
+        self.route_types = frozenset(t for t in route_types if t not in GENERIC_TYPES)
+        self.keywords = [k.strip() for k in (args.keywords or "").split(",") if k.strip()]
+        self.centers = parse_centers(args.centers)
+        self.radius_m = int(args.radius)
+        self.rows_by_pid: Dict[str, Dict[str, str]] = {}
+        # Rows of the output CSV as it was before the run (--textsearch-rows only)
+        self.prior: Dict[str, Dict[str, str]] = {}
+        # Run state, reset by FetchRun
+        self.cap = 0
+        self.inflight: set = set()   # place_ids whose Details are queued or running
+        self.full = threading.Event()
+        # --shard: this run's partial CSV (set by run_fetch); the output CSV is only read
+        self.shard_csv: Optional[Path] = None
+        # --refresh --shard: write() keeps only this shard's place_ids (set by refresh_rows)
+        self.write_shard: Optional[Shard] = None
+
+    def seed(self) -> None:
+        """--incremental: start from the rows already in the output CSV."""
+        self.header_order = seed_rows_from_csv(self.out_csv, self.rows_by_pid, self.header_order)
+        print(f"[incremental] Seeded {len(self.rows_by_pid)} existing rows from {self.out_csv.name}")
+
+    def load_prior(self) -> None:
+        self.prior = {}
+        seed_rows_from_csv(self.out_csv, self.prior, self.header_order)
+
+    @property
+    def target_csv(self) -> Path:
+        """Where write() goes: the output CSV, or this shard's partial CSV."""
+        return self.shard_csv or self.out_csv
+
+    def write(self) -> List[Dict[str, str]]:
+        """Write the collected rows, sorted by name/city; returns them."""
+        rows = sort_rows([row for pid, row in self.rows_by_pid.items() if self.owns(pid)])
+        self.target_csv.parent.mkdir(parents=True, exist_ok=True)
+        write_csv(self.target_csv, self.header_order, rows)
+        return rows
+
+    def owns(self, pid: str) -> bool:
+        """
+        Whether write() includes this row. A --refresh --shard run seeds every
+        row but refreshes only its own, so it writes only its own too: other
+        shards' stale copies would otherwise win the blank-filling merge.
+        Rows without a place_id go with shard 1.
+        """
+        if self.write_shard is None:
+            return True
+        if pid.startswith("row:"):
+            return self.write_shard[0] == 1
+        return in_shard(pid, self.write_shard)
+
+    def exhausted(self) -> bool:
+        """No --max-places budget left for further Details (caller holds the run lock)."""
+        return bool(self.cap) and len(self.rows_by_pid) + len(self.inflight) >= self.cap
+
+
+# (keyword, resolved Places type, tile) → the categories that asked for it
+QueryKey = Tuple[str, Optional[str], Tile]
+Pending = List[Tuple[Category, Dict[str, Any], Any]]
+
+
+class FetchRun:
+    """
+    Shared state for one fetch run over one or more categories. Several
+    (keyword, tile) queries run at once on a small query pool; each hands its
+    Place Details to a separate, bounded Details pool and only collects them
+    after the next page's token has matured, so Details for page N overlap the
+    wait for page N+1 and other queries fill the remaining idle time.
+
+    Identical queries from different categories are issued once, and every
+    place_id is detailed at most once per run no matter how many categories
+    find it; each category still gets its own row built from that payload.
+
+    With --textsearch-rows, rows are built from the Text Search item and the
+    place's existing CSV row; Details ask only for the fields of columns still
+    missing (details_mask), and complete rows are never sent.
+    """
+
+    def __init__(self, api_key: str, categories: List[Category], args, journal: Optional[Journal] = None,
+                 report: Optional[RunReport] = None, planner: Optional[YieldPlanner] = None):
+        self.api_key = api_key
+        self.categories = categories
+        self.args = args
+        self.journal = journal
+        self.report = report
+        self.planner = planner
+        self.lock = threading.Lock()
+        self.textsearch_rows = bool(getattr(args, "textsearch_rows", False))
+        self.shard: Optional[Shard] = parse_shard(getattr(args, "shard", None))
+        # (place_id, field key) → Future of its Details payload, shared by all categories
+        self.details: Dict[Tuple[str, str], Any] = {}
+        self.details_pool: Optional[ThreadPoolExecutor] = None
+        self.details_reused = 0
+        # Set once the budget ledger refuses a call; no further queries are scheduled
+        self.out_of_budget = threading.Event()
+        # Why run() left queries of the plan unissued ("wall timeout", "budget"), if it did
+        self.cut_short: Optional[str] = None
+        for cat in categories:
+            # Rows already present (e.g. seeded by --incremental) never count towards --max-places
+            cat.cap = (len(cat.rows_by_pid) + cat.args.max_places) if cat.args.max_places else 0
+            cat.inflight = set()
+            cat.full.clear()
+        if self.textsearch_rows:
+            for cat in categories:
+                cat.load_prior()
+        if journal is not None and journal.resumed:
+            self._replay_rows()
+        if planner is not None:
+            for cat in categories:
+                on_disk: Dict[str, Dict[str, str]] = {}
+                seed_rows_from_csv(cat.out_csv, on_disk, cat.header_order)
+                planner.prime(cat.name, list(on_disk) + list(cat.rows_by_pid))
+
+    def _replay_rows(self) -> None:
+        """Fold rows from an interrupted run back in; they count towards --max-places."""
+        by_name = {c.name: c for c in self.categories}
+        n = 0
+        for name, pid, row in self.journal.rows:
+            cat = by_name.get(name)
+            if cat is None:
+                continue
+            cat.rows_by_pid[pid] = merge_rows(cat.rows_by_pid[pid], row) if pid in cat.rows_by_pid else row
+            n += 1
+        for cat in self.categories:
+            if cat.cap and len(cat.rows_by_pid) >= cat.cap:
+                cat.full.set()
+        print(f"[journal] Resuming {self.journal.path.name}: {n} rows, "
+              f"{len(self.journal.done)} finished queries, "
+              f"{sum(len(v) for v in self.journal.pages.values())} recorded pages")
+
+    # ---- shared row maps (all access under self.lock) ----
+    def _route(self, cats: List[Category], it: Dict[str, Any]) -> List[Category]:
+        """
+        Categories a result belongs to: those of the run whose route_types it
+        carries (a restaurant found by a catering search goes to restaurants),
+        preferring the ones that searched for it; the searching categories
+        when its types name none.
+        """
+        types = set(it.get("types") or [])
+        owners = [c for c in self.categories if c.route_types & types]
+        if not owners:
+            return cats
+        return [c for c in owners if c in cats] or owners
+
+    def _claim(self, cats: List[Category], results: List[Dict[str, Any]], query_pids: set,
+               stats: Dict[str, Any]) -> List[Tuple[Category, Dict[str, Any]]]:
+        """Reserve unseen place_ids on a page for the categories they route to; other queries skip them."""
+        todo = []
+        with self.lock:
+            for it in results:
+                pid = it.get("place_id")
+                if not pid or pid in query_pids:
+                    continue
+                query_pids.add(pid)
+                stats["results"] += 1
+                new = novel = False
+                for cat in self._route(cats, it):
+                    if pid in cat.rows_by_pid or pid in cat.inflight:
+                        continue
+                    new = True
+                    if self.planner is not None and self.planner.is_novel(cat.name, pid):
+                        novel = True
+                    # Never request more Details than the remaining --max-places budget
+                    if cat.exhausted():
+                        continue
+                    cat.inflight.add(pid)
+                    todo.append((cat, it))
+                if new:
+                    stats["new"] += 1
+                if novel:
+                    stats["novel"] += 1
+        return todo
+
+    def _store(self, cat: Category, pid: str, row: Optional[Dict[str, str]]) -> None:
+        """Release the claim on pid and merge its row (if any) into the category."""
+        with self.lock:
+            cat.inflight.discard(pid)
+            if row is None:
+                return
+            if pid in cat.rows_by_pid:
+                cat.rows_by_pid[pid] = merge_rows(cat.rows_by_pid[pid], row)
+            else:
+                cat.rows_by_pid[pid] = row
+            n = len(cat.rows_by_pid)
+            if cat.cap and n >= cat.cap:
+                cat.full.set()
+        if self.journal is not None:
+            self.journal.row(cat.name, pid, row)
+        if n % 25 == 0:
+            label = f"{cat.name}: " if len(self.categories) > 1 else ""
+            print(f"[progress] {label}{n} unique places so far…")
+            if QUOTA is not None:
+                print(f"[quota] {QUOTA.summary()}")
+
+    def _collect(self, pending: Pending) -> None:
+        """Wait for queued Details and fold the resulting rows into each category's rows."""
+        while pending:
+            cat, it, fut = pending.pop(0)
+            pid = it["place_id"]
+            try:
+                det = fut.result()
+            except BudgetExceeded as e:
+                self._budget_hit(e)
+                det = {"status": "BUDGET_EXCEEDED"}
+            except Exception:
+                with self.lock:
+                    cat.inflight.discard(pid)
+                raise
+            row = None
+            if det.get("status") == "OK":
+                p = det.get("result", {}) or {}
+                if self.textsearch_rows:
+                    # Masked payload on top of what Text Search already gave us
+                    p = {**it, **p}
+                if (p.get("name") or "").strip():
+                    row = cat.build_row(it, p)
+            elif self.textsearch_rows and (it.get("name") or "").strip():
+                row = cat.build_row(it, it)
+            if row is not None and self.textsearch_rows:
+                row = self._with_prior(cat, pid, row)
+            self._store(cat, pid, row)
+
+    def _budget_hit(self, e: BudgetExceeded) -> None:
+        with self.lock:
+            first = not self.out_of_budget.is_set()
+            self.out_of_budget.set()
+        if first:
+            print(f"[budget] {e}; stopping…")
+
+    def _with_prior(self, cat: Category, pid: str, row: Dict[str, str]) -> Dict[str, str]:
+        """Fill a fresh row's blanks from the place's existing CSV row, if any."""
+        prior = cat.prior.get(pid)
+        return with_fresh_status(merge_rows(row, prior), row) if prior else row
+
+    def _submit_details(self, todo: List[Tuple[Category, Dict[str, Any]]], pending: Pending,
+                        stats: Dict[str, Any], meter: Optional[CostMeter] = None) -> None:
+        for cat, it in todo:
+            pid = it["place_id"]
+            basic_only = bool(cat.args.basic_only)
+            fields = details_fields(basic_only)
+            # Items without a name (rare) still get the full Details field list
+            if self.textsearch_rows and (it.get("name") or "").strip():
+                row = self._with_prior(cat, pid, cat.build_row(it, it))
+                fields = details_mask(row, cat.header_order, basic_only)
+                if not fields:
+                    self._store(cat, pid, row)
+                    continue
+            key = (pid, field_key(fields))
+            with self.lock:
+                fut = self.details.get(key)
+                if fut is None:
+                    fut = self.details_pool.submit(place_details, self.api_key, pid, basic_only, fields,
+                                                   category=cat.name, meter=meter)
+                    self.details[key] = fut
+                    stats["details"] += 1
+                else:
+                    self.details_reused += 1
+            pending.append((cat, it, fut))
+
+    # ---- one query ----
+    def fetch_for_center_keyword(self, cats: List[Category], lat, lng, radius_m, keyword,
+                                 place_type: Optional[str], qid: str = "") -> Dict[str, Any]:
+        """
+        One (center, keyword) with guards, on behalf of `cats`. Returns per-query stats:
+          results   – unique place_ids returned across pages
+          new       – of those, how many were not yet known to some category
+          novel     – with --plan-by-yield: new and not in the category CSV either
+          pages     – Text Search pages consumed
+          saturated – Google had more to give (page limit hit with a token left,
+                      or the 60-result ceiling reached)
+          stop      – every category is full; no further queries should be issued
+        plus, for the report, the Details calls it queued (details), the requests
+        actually sent for it (textsearch_calls, details_calls: token polls and
+        retries included, Details cache hits and journal replays not) with
+        their cost_usd, and wall_sec.
+        """
+        stats = {"results": 0, "new": 0, "novel": 0, "pages": 0, "saturated": False, "stop": False,
+                 "details": 0}
+        t0 = time.perf_counter()
+        meter = CostMeter()
+        pending: Pending = []
+        # Pages an interrupted run already paid for are replayed from the journal
+        replay = list(self.journal.pages.get(qid, [])) if self.journal is not None else []
+        # A shared query pages as far as the most demanding category allows (0 = no limit)
+        limits = [c.args.max_pages_per_query or 0 for c in cats]
+        max_pages = 0 if 0 in limits else max(limits)
+        label = "+".join(c.name for c in cats)   # who the Text Search calls are charged to
+        if replay:
+            data = replay.pop(0)
+        else:
+            data = places_text_search(self.api_key, keyword, lat, lng, radius_m, place_type,
+                                      page_token=None, category=label, meter=meter)
+            self._journal_page(qid, data)
+        seen_tokens = set()
+        pages_fetched = 0
+        last_page_pids = set()
+        query_pids = set()
+
+        try:
+            while True:
+                status = data.get("status")
+                if status not in ("OK", "ZERO_RESULTS"):
+                    print(f"[{keyword}] TextSearch status: {status} {data.get('error_message','')}", file=sys.stderr)
+                    break
+
+                results = data.get("results", []) or []
+                curr_page_pids = {it.get("place_id") for it in results if it.get("place_id")}
+
+                # Skip already-known PIDs to avoid repeated Details calls; the rest
+                # run in the background while we wait for the next page token.
+                self._submit_details(self._claim(cats, results, query_pids, stats), pending, stats, meter)
+
+                with self.lock:
+                    budget_left = not all(c.exhausted() for c in cats)
+                if not budget_left:
+                    self._collect(pending)
+                    if all(c.full.is_set() for c in cats):
+                        caps = ", ".join(str(c.args.max_places) for c in cats)
+                        print(f"[guard] Reached --max-places={caps}; stopping this query.")
+                        stats["stop"] = True
+                        return stats
+
+                if curr_page_pids and curr_page_pids == last_page_pids:
+                    print("[guard] Duplicate page detected; breaking pagination loop.")
+                    break
+                last_page_pids = curr_page_pids
+
+                pages_fetched += 1
+                stats["pages"] = pages_fetched
+                if stats["results"] >= TEXTSEARCH_RESULT_CEILING:
+                    stats["saturated"] = True
+                if max_pages and pages_fetched >= max_pages:
+                    if data.get("next_page_token"):
+                        stats["saturated"] = True
+                    break
+
+                token = data.get("next_page_token")
+                if not token:
+                    break
+                if token in seen_tokens:
+                    print("[guard] Seen this next_page_token already; breaking to avoid loop.")
+                    break
+                seen_tokens.add(token)
+
+                if replay:
+                    nxt = replay.pop(0)
+                else:
+                    nxt = self._next_page(keyword, lat, lng, radius_m, place_type, token, label, meter)
+                    if nxt is not None:
+                        self._journal_page(qid, nxt)
+                # Details for the page we just left have been running during the wait
+                self._collect(pending)
+                if nxt is None:
+                    break
+                data = nxt
+        finally:
+            self._collect(pending)
+            stats["wall_sec"] = time.perf_counter() - t0
+            stats["textsearch_calls"] = meter.calls[TEXTSEARCH]
+            stats["details_calls"] = meter.calls[DETAILS]
+            stats["cost_usd"] = meter.cost_usd
+
+        if all(c.full.is_set() for c in cats):
+            stats["stop"] = True
+        return stats
+
+    def _journal_page(self, qid: str, data: Dict[str, Any]) -> None:
+        if self.journal is not None and qid and data.get("status") in ("OK", "ZERO_RESULTS"):
+            self.journal.page(qid, data)
+
+    def _next_page(self, keyword, lat, lng, radius_m, place_type, token,
+                   label: str = "", meter: Optional[CostMeter] = None) -> Optional[Dict[str, Any]]:
+        """Wait up to ~12s for the token to mature; None if pagination has to stop."""
+        for _ in range(PAGE_TOKEN_ATTEMPTS):
+            time.sleep(PAGE_TOKEN_DELAY_SEC)
+            nxt = places_text_search(self.api_key, keyword, lat, lng, radius_m, place_type,
+                                     page_token=token, category=label, meter=meter)
+            stat = nxt.get("status")
+            if stat == "OK":
+                return nxt
+            elif stat in ("INVALID_REQUEST", "UNKNOWN_ERROR"):
+                continue
+            elif stat in ("OVER_QUERY_LIMIT", "REQUEST_DENIED"):
+                print(f"[warn] {stat} during pagination; stopping this query.")
+                return None
+            else:
+                print(f"[warn] Pagination stopped with status={stat}")
+                return None
+        return None
+
+    # ---- whole run ----
+    def plan(self) -> Deque[Tuple[QueryKey, List[Category]]]:
+        """
+        Every category's (keyword, center) queries in order, identical ones merged;
+        with --shard, only this shard's share; with --plan-by-yield, reordered by
+        past yield and without dead pairs.
+        """
+        merged: Dict[QueryKey, Tuple[str, List[Category]]] = {}
+        for cat in self.categories:
+            for kw in cat.keywords:
+                t = resolve_place_type(cat.place_type, kw)
+                for tile in root_tiles(cat.centers, cat.radius_m):
+                    key = (kw.casefold(), t, tile)
+                    if key not in merged:
+                        merged[key] = (kw, [])
+                    merged[key][1].append(cat)
+        entries = [((kw, t, tile), cats) for (_, t, tile), (kw, cats) in merged.items()]
+        if self.shard is not None:
+            total = len(entries)
+            entries = [e for e in entries if in_shard(query_id(e[0][0], e[0][1], e[0][2]), self.shard)]
+            print(f"[shard] {shard_label(self.shard)}: {len(entries)} of {total} queries")
+        if self.planner is not None:
+            keyed = [(pair_key([c.name for c in cats], kw, t, tile), ((kw, t, tile), cats))
+                     for (kw, t, tile), cats in entries]
+            entries, skipped, reprobed = self.planner.order(keyed)
+            print(f"[plan] {len(entries)} queries by expected yield; "
+                  f"skipped {skipped} dead pairs, re-probing {reprobed}")
+        return deque(entries)
+
+    def run(self) -> None:
+        """
+        Schedule queries in plan order, --query-concurrency at a time, until every
+        category is full, --wall-timeout-sec trips or the budget ledger refuses a call.
+        With --adaptive-tiles, children of a saturated tile are queued next.
+        Queries the journal records as finished are not re-issued.
+        """
+        args = self.args
+        start_ts = time.time()
+        plan = self.plan()
+        workers = max(1, int(getattr(args, "details_concurrency", DEFAULT_DETAILS_CONCURRENCY) or 1))
+        q_workers = max(1, int(getattr(args, "query_concurrency", DEFAULT_QUERY_CONCURRENCY) or 1))
+        running: Dict[Any, Tuple[QueryKey, List[Category]]] = {}
+        stop = False
+
+        with ThreadPoolExecutor(max_workers=workers) as self.details_pool, \
+             ThreadPoolExecutor(max_workers=q_workers) as query_pool:
+            while (plan and not stop) or running:
+                while plan and not stop and len(running) < q_workers:
+                    if args.wall_timeout_sec and (time.time() - start_ts) > args.wall_timeout_sec:
+                        print("[guard] Wall timeout reached; stopping…")
+                        self.cut_short = "wall timeout"
+                        stop = True
+                        break
+                    if all(c.full.is_set() for c in self.categories) or self.out_of_budget.is_set():
+                        stop = True
+                        break
+                    (kw, t, tile), cats = plan.popleft()
+                    cats = [c for c in cats if not c.full.is_set()]
+                    if not cats:
+                        continue
+                    qid = query_id(kw, t, tile)
+                    if self.journal is not None and qid in self.journal.done:
+                        self._split(kw, t, tile, cats, self.journal.done[qid], plan)
+                        continue
+                    lat, lng, r_m, depth = tile
+                    where = f" (tile r={r_m} m, depth {depth})" if depth else ""
+                    who = f" [{', '.join(c.name for c in cats)}]" if len(self.categories) > 1 else ""
+                    print(f"→ Query '{kw}' @ {lat:.3f},{lng:.3f}{where}{who}")
+                    fut = query_pool.submit(self.fetch_for_center_keyword, cats, lat, lng, r_m, kw, t, qid)
+                    running[fut] = ((kw, t, tile), cats)
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    (kw, t, tile), cats = running.pop(fut)
+                    try:
+                        stats = fut.result()
+                    except BudgetExceeded as e:
+                        # Not journaled as done: a resumed or later run issues it again
+                        self._budget_hit(e)
+                        stop = True
+                        continue
+                    if self.report is not None:
+                        self.report.query(kw, t, tile, [c.name for c in cats], stats)
+                    if stats["stop"]:
+                        if all(c.full.is_set() for c in self.categories):
+                            stop = True
+                        continue
+                    if self.journal is not None:
+                        self.journal.query_done(query_id(kw, t, tile), stats)
+                    if self.planner is not None and tile[3] == 0:
+                        self.planner.record(pair_key([c.name for c in cats], kw, t, tile), stats["novel"])
+                    self._split(kw, t, tile, cats, stats, plan)
+        if self.out_of_budget.is_set():
+            self.cut_short = "budget"
+
+    def _split(self, kw: str, t: Optional[str], tile: Tile, cats: List[Category],
+               stats: Dict[str, Any], plan: Deque[Tuple[QueryKey, List[Category]]]) -> None:
+        """With --adaptive-tiles, queue the children of a saturated tile next."""
+        lat, lng, r_m, depth = tile
+        if getattr(self.args, "adaptive_tiles", False) and should_split(stats, r_m, depth, self.args):
+            print(f"[tiles] '{kw}' saturated at r={r_m} m "
+                  f"({stats['new']}/{stats['results']} new); splitting into 4")
+            for child in reversed(child_tiles(*tile)):
+                plan.appendleft(((kw, t, child), cats))
+
+def write_report(report: RunReport, args, categories: List[Category], finished: bool) -> None:
+    data = report.build(QUOTA.snapshot(), {c.name: len(c.rows_by_pid) for c in categories},
+                        cache_hits=DETAILS_CACHE.hits if DETAILS_CACHE is not None else 0,
+                        cache_misses=DETAILS_CACHE.misses if DETAILS_CACHE is not None else 0)
+    data["summary"]["finished"] = finished
+    if LEDGER is not None:
+        data["budget"] = LEDGER.remaining()
+    path = Path(getattr(args, "report", None) or default_report_path(report.names, run_suffix(args)))
+    report.write(path, data)
+    s = data["summary"]
+    print(f"[report] {s['queries']} queries, {s['new']}/{s['results']} new (dup {s['dup_rate']:.0%}), "
+          f"{s['details_calls']} Details, ${s['cost_usd']:.2f} → {path}")
+
+# ─────────────────── Stale-row refresh ────────────────────
+# Identity columns pages and links are built from; a renamed place keeps them
+REFRESH_KEEP = ("id", "slug")
+
+def stale_place_ids(rows_by_pid: Dict[str, Dict[str, str]], older_than_days: float,
+                    missing: List[str], limit: int) -> List[str]:
+    """
+    --refresh: place_ids whose last_updated is blank or older than
+    `older_than_days` (0 = any age) and, with `missing`, that have at least one
+    of those columns blank. Oldest first, at most `limit` (0 = all).
+    """
+    cutoff = None
+    if older_than_days > 0:
+        cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - older_than_days * 86400))
+    picked = []
+    for pid, row in rows_by_pid.items():
+        if pid.startswith("row:"):
+            continue
+        updated = (row.get("last_updated") or "").strip()
+        if cutoff is not None and updated and updated >= cutoff:
+            continue
+        if missing and all((row.get(c) or "").strip() for c in missing):
+            continue
+        picked.append((updated, row.get("name", ""), pid))
+    picked.sort()
+    pids = [pid for _, _, pid in picked]
+    return pids[:limit] if limit else pids
+
+def refreshed_row(old: Dict[str, str], fresh: Dict[str, str]) -> Dict[str, str]:
+    """Fresh Details values win; columns they leave blank (enrichment, …) keep the old ones."""
+    row = with_fresh_status(merge_rows(fresh, old), fresh)
+    # A Maps fallback never replaces a real website, nor the columns derived from it
+    if is_maps_fallback(fresh.get("website", "")) and not is_maps_fallback(row.get("website", "")):
+        for k, v in fresh.items():
+            if is_maps_fallback(str(v)) or k == "logo_url":
+                row[k] = old.get(k) or v
+    for k in REFRESH_KEEP:
+        if old.get(k):
+            row[k] = old[k]
+    return row
+
+def refresh_rows(api_key: str, categories: List[Category], args) -> List[Category]:
+    """
+    Re-request Details for each category's stalest rows instead of searching,
+    --details-concurrency at a time, and merge the results back into its rows.
+    Cached payloads are not reused (that is what a refresh is for); a place_id
+    shared by several categories is requested once.
+    """
+    workers = max(1, int(getattr(args, "details_concurrency", DEFAULT_DETAILS_CONCURRENCY) or 1))
+    missing = [c.strip() for c in (getattr(args, "refresh_missing", "") or "").split(",") if c.strip()]
+    shard = parse_shard(getattr(args, "shard", None))
+    plan: List[Tuple[Category, List[str], List[str]]] = []
+    for cat in categories:
+        if not cat.rows_by_pid:
+            cat.seed()
+        cat.write_shard = shard
+        pids = stale_place_ids(cat.rows_by_pid, args.refresh_older_than_days, missing, 0)
+        pids = [pid for pid in pids if in_shard(pid, shard)]
+        pids = pids[:args.refresh_limit] if args.refresh_limit else pids
+        print(f"[refresh] {cat.name}: {len(pids)} of {len(cat.rows_by_pid)} rows selected")
+        plan.append((cat, pids, details_fields(bool(cat.args.basic_only))))
+
+    counts = {"refreshed": 0, "not_found": 0, "failed": 0}
+    out_of_budget = False
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures: Dict[Tuple[str, str], Any] = {}
+        for cat, pids, fields in plan:
+            for pid in pids:
+                key = (pid, field_key(fields))
+                if key not in futures:
+                    futures[key] = pool.submit(place_details, api_key, pid, bool(cat.args.basic_only),
+                                               fields, category=cat.name, cached=False)
+        for cat, pids, fields in plan:
+            for pid in pids:
+                try:
+                    det = futures[(pid, field_key(fields))].result()
+                except BudgetExceeded as e:
+                    if not out_of_budget:
+                        print(f"[budget] {e}; remaining rows are left as they are")
+                    out_of_budget = True
+                    counts["failed"] += 1
+                    continue
+                except Exception as e:
+                    print(f"[warn] Details for {pid} failed: {e}", file=sys.stderr)
+                    counts["failed"] += 1
+                    continue
+                p = det.get("result", {}) or {}
+                if det.get("status") != "OK" or not (p.get("name") or "").strip():
+                    counts["not_found" if det.get("status") == "NOT_FOUND" else "failed"] += 1
+                    continue
+                cat.rows_by_pid[pid] = refreshed_row(cat.rows_by_pid[pid], cat.build_row(p, p))
+                counts["refreshed"] += 1
+    print(f"[refresh] {counts['refreshed']} rows refreshed, {counts['not_found']} no longer found "
+          f"(left unchanged), {counts['failed']} failed")
+    return categories
+
+# ─────────────────────────── Run ──────────────────────────
+def start_services(args) -> None:
+    """Open the run-wide Places plumbing: base URL, fixtures, Details cache, quota, ledger."""
+    global DETAILS_CACHE, QUOTA, LEDGER, FIXTURES, PLACES_BASE_URL
+    if getattr(args, "places_base_url", None):
+        PLACES_BASE_URL = args.places_base_url.rstrip("/")
+    if getattr(args, "record_fixtures", None):
+        Path(args.record_fixtures).parent.mkdir(parents=True, exist_ok=True)
+        FIXTURES = open(args.record_fixtures, "a", encoding="utf-8")
+    DETAILS_CACHE = open_details_cache(args)
+    QUOTA = quota_from_args(args)
+    LEDGER = ledger_from_args(args)
+
+def stop_services() -> None:
+    """Print the cache/quota/budget summaries and close what start_services() opened."""
+    global DETAILS_CACHE, QUOTA, LEDGER, FIXTURES
+    if DETAILS_CACHE is not None:
+        print(f"[cache] Details cache: {DETAILS_CACHE.hits} hits, {DETAILS_CACHE.misses} misses")
+        DETAILS_CACHE.close()
+        DETAILS_CACHE = None
+    print(f"[quota] {QUOTA.summary()}")
+    QUOTA = None
+    if LEDGER is not None:
+        refused = f"; {LEDGER.refused} calls refused" if LEDGER.refused else ""
+        print(f"[budget] {LEDGER.summary()}{refused}")
+        LEDGER.close()
+        LEDGER = None
+    if FIXTURES is not None:
+        FIXTURES.close()
+        FIXTURES = None
+
+def fetch_new_rows(api_key: str, categories: List[Category], args) -> List[Category]:
+    """One FetchRun with its journal, report and planner (services already started)."""
+    journal = open_journal(args, categories)
+    report = None if getattr(args, "no_report", False) else RunReport([c.name for c in categories], args)
+    planner = planner_from_args(args)
+    finished = False
+    cut_short: Optional[str] = None
+    try:
+        run = FetchRun(api_key, categories, args, journal, report, planner)
+        run.run()
+        finished = True
+        cut_short = run.cut_short
+        if len(categories) > 1:
+            print(f"[shared] {run.details_reused} Details payloads reused across categories")
+        return categories
+    finally:
+        if journal is not None:
+            # A run stopped by --wall-timeout-sec or the budget leaves its journal
+            # open, so the next run picks up the queries it did not reach
+            journal.close(complete=finished and cut_short is None)
+            if not finished:
+                print(f"[journal] Run interrupted; rerun the same command to resume from {journal.path}")
+            elif cut_short is not None:
+                print(f"[journal] Stopped early ({cut_short}); rerun the same command to continue from {journal.path}")
+        if report is not None:
+            write_report(report, args, categories, finished)
+        if planner is not None:
+            planner.close()
+
+def run_fetch(api_key: str, categories: List[Category], args) -> List[Category]:
+    """
+    Walk every category's (keyword, center) pairs until each hits its
+    --max-places or --wall-timeout-sec trips. Rows already in a category
+    (e.g. seeded by --incremental) never count towards --max-places, which
+    limits newly discovered places only.
+    With --refresh, re-detail the stalest existing rows instead (refresh_rows).
+    With --shard, only this shard's queries run and write() goes to a partial CSV.
+    """
+    try:
+        shard = parse_shard(getattr(args, "shard", None))
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
+    if shard is not None:
+        for cat in categories:
+            cat.shard_csv = shard_csv(Path(args.shard_dir), cat.name, shard)
+    start_services(args)
+    try:
+        if getattr(args, "refresh", False):
+            return refresh_rows(api_key, categories, args)
+        return fetch_new_rows(api_key, categories, args)
+    finally:
+        stop_services()
+
+
+# ─────────────────────────── CLI ──────────────────────────
+def add_engine_args(parser) -> None:
+    """Flags shared by every fetcher that are handled by the engine itself."""
+    parser.add_argument("--details-concurrency", type=int, default=DEFAULT_DETAILS_CONCURRENCY,
+                        help="Max Place Details requests in flight at once.")
+    parser.add_argument("--query-concurrency", type=int, default=DEFAULT_QUERY_CONCURRENCY,
+                        help="Max (keyword, center) Text Search queries paginating at once.")
+    parser.add_argument("--details-cache", type=str, default=str(DEFAULT_CACHE_PATH),
+                        help="SQLite file caching raw Place Details payloads across runs.")
+    parser.add_argument("--details-cache-ttl-days", type=float, default=DEFAULT_TTL_DAYS,
+                        help="Ignore cached Details older than this many days (0 = never expire).")
+    parser.add_argument("--no-details-cache", action="store_true",
+                        help="Always call Place Details; do not read or write the cache.")
+    parser.add_argument("--textsearch-rows", action="store_true",
+                        help="Build rows from the Text Search result and the existing CSV row; Details "
+                             "request only the fields for columns still missing (none if nothing is).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Seed from the existing output CSV; only request Details for unseen "
+                             "place_ids and keep rows this run does not rediscover.")
+    parser.add_argument("--journal", type=str, default=None,
+                        help="Checkpoint journal (JSONL); an unfinished one is resumed. "
+                             "Default: scripts/tmp/journal/<category>.jsonl")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="Do not checkpoint this run.")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard an unfinished journal instead of resuming it.")
+    parser.add_argument("--places-base-url", type=str, default=None,
+                        help="Places API base URL, e.g. a local stand-in (python -m places.standin). "
+                             "Default: $PLACES_API_BASE_URL or Google.")
+    parser.add_argument("--record-fixtures", type=str, default=None,
+                        help="Append every Places response (minus the key) to this JSONL file "
+                             "for replay by the local stand-in.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Skip discovery: re-request Details for the stalest rows of the output CSV "
+                             "and merge the fresh values in.")
+    parser.add_argument("--refresh-limit", type=int, default=50,
+                        help="With --refresh: at most this many rows per category, oldest first (0 = all).")
+    parser.add_argument("--refresh-older-than-days", type=float, default=30.0,
+                        help="With --refresh: only rows whose last_updated is older than this (0 = any age).")
+    parser.add_argument("--refresh-missing", type=str, default="",
+                        help="With --refresh: only rows with at least one of these comma-separated columns blank.")
+    add_tiling_args(parser)
+    add_quota_args(parser)
+    add_report_args(parser)
+    add_planner_args(parser)
+    add_ledger_args(parser)
+    add_shard_args(parser)
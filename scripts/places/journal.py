@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only checkpoint journal for fetch runs (JSONL, one record per line).
+
+- "page": a Text Search page as received for a (keyword, type, tile) query,
+  with its results and next_page_token (the query's cursor)
+- "done": a query that finished paginating, with its stats
+- "row":  a category row built for a place_id (before merging)
+- "complete": the run finished normally; the next run starts fresh
+
+Every record is flushed and fsync'd before the caller moves on, so a run
+killed at any point can be replayed up to its last record: finished queries
+are skipped, recorded pages are served from the journal and journaled rows
+never cost another Details call. A torn last line left by the kill is cut
+off before the resumed run appends, so it cannot swallow the next record.
+"""
+
+from __future__ import annotations
+import json, os, threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]   # repo root (scripts/places/ under root)
+JOURNAL_DIR = ROOT / "scripts" / "tmp" / "journal"
+
+
+def default_journal_path(names: List[str], suffix: str = "") -> Path:
+    return JOURNAL_DIR / ("+".join(names) + suffix + ".jsonl")
+
+def query_id(keyword: str, place_type: Optional[str], tile: Tuple[float, float, int, int]) -> str:
+    lat, lng, radius_m, depth = tile
+    return f"{keyword.casefold()}|{place_type or ''}|{lat:.6f},{lng:.6f}|{radius_m}|{depth}"
+
+
+class Journal:
+    def __init__(self, path: Path, resume: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.pages: Dict[str, List[Dict[str, Any]]] = {}
+        self.done: Dict[str, Dict[str, Any]] = {}
+        self.rows: List[Tuple[str, str, Dict[str, str]]] = []
+        replay = resume and self._load()
+        if replay:
+            self._truncate_torn_tail()
+        self._f = self.path.open("a" if replay else "w", encoding="utf-8")
+        self.resumed = replay
+
+    def _load(self) -> bool:
+        """Read an unfinished journal; False if there is none (or it completed)."""
+        if not self.path.exists():
+            return False
+        complete = False
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue   # torn last line from a crash
+                t = rec.get("t")
+                if t == "page":
+                    self.pages.setdefault(rec["q"], []).append(rec["data"])
+                elif t == "done":
+                    self.done[rec["q"]] = rec["stats"]
+                elif t == "row":
+                    self.rows.append((rec["cat"], rec["pid"], rec["row"]))
+                elif t == "complete":
+                    complete = True
+        if complete:
+            self.pages, self.done, self.rows = {}, {}, []
+            return False
+        return True
+
+    def _truncate_torn_tail(self) -> None:
+        """Cut the file back to just after its last newline."""
+        with self.path.open("rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                step = min(pos, 64 * 1024)
+                f.seek(pos - step)
+                nl = f.read(step).rfind(b"\n")
+                if nl >= 0:
+                    pos = pos - step + nl + 1
+                    break
+                pos -= step
+            if pos < end:
+                f.truncate(pos)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def page(self, qid: str, data: Dict[str, Any]) -> None:
+        self._append({"t": "page", "q": qid, "data": {
+            "status": data.get("status"),
+            "results": data.get("results", []) or [],
+            "next_page_token": data.get("next_page_token"),
+        }})
+
+    def query_done(self, qid: str, stats: Dict[str, Any]) -> None:
+        self._append({"t": "done", "q": qid, "stats": stats})
+
+    def row(self, cat: str, pid: str, row: Dict[str, str]) -> None:
+        self._append({"t": "row", "cat": cat, "pid": pid, "row": row})
+
+    def close(self, complete: bool) -> None:
+        if complete:
+            self._append({"t": "complete"})
+        with self._lock:
+            self._f.close()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent Places API budget ledger shared by every fetch run.
+
+- Counts Text Search and Details calls (and their estimated cost) per
+  category per UTC day, in SQLite next to the Details cache
+- Every billable call is charged *before* it is sent; a call that would take
+  today's or this month's spend (all categories together) or one category's
+  daily spend past its cap raises BudgetExceeded instead
+- Check and charge happen in one write transaction, so parallel runs on the
+  same ledger file cannot overshoot a cap together
+- In CI every fetch workflow restores and saves the ledger under one shared
+  actions/cache key (places-ledger-), with caps from the repo variables
+  PLACES_BUDGET_DAILY_USD / PLACES_BUDGET_MONTHLY_USD; workflows running at
+  the same time each start from the last saved copy, so there the caps are
+  only exact for runs that do not overlap
+
+Remaining budget, per category for today:
+  python -m places.ledger --daily-usd 20 --monthly-usd 300
+"""
+
+from __future__ import annotations
+import argparse, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .cache import CACHE_DIR
+
+DEFAULT_LEDGER_PATH = CACHE_DIR / "places_budget.sqlite"
+
+
+class BudgetExceeded(RuntimeError):
+    """A Places call was refused because it would exceed a budget cap."""
+
+
+def today() -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+class BudgetLedger:
+    def __init__(self, path: Path = DEFAULT_LEDGER_PATH, daily_usd: float = 0.0,
+                 monthly_usd: float = 0.0, category_daily_usd: float = 0.0):
+        """Caps are in USD; 0 means no cap (calls are still counted)."""
+        self.path = Path(path)
+        self.daily_usd = max(0.0, float(daily_usd or 0))
+        self.monthly_usd = max(0.0, float(monthly_usd or 0))
+        self.category_daily_usd = max(0.0, float(category_daily_usd or 0))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spend ("
+            " day TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " endpoint TEXT NOT NULL,"
+            " calls INTEGER NOT NULL,"
+            " cost_usd REAL NOT NULL,"
+            " PRIMARY KEY (day, category, endpoint))"
+        )
+        self.refused = 0
+
+    def _spent(self, where: str, args) -> float:
+        cur = self._db.execute(f"SELECT COALESCE(SUM(cost_usd), 0) FROM spend WHERE {where}", args)
+        return float(cur.fetchone()[0])
+
+    def charge(self, category: str, endpoint: str, cost_usd: float) -> None:
+        """Record one call about to be sent, or raise BudgetExceeded if a cap forbids it."""
+        day = today()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                checks = [
+                    ("daily", self.daily_usd, "day = ?", (day,)),
+                    ("monthly", self.monthly_usd, "day LIKE ?", (day[:7] + "-%",)),
+                    (f"{category} daily", self.category_daily_usd, "day = ? AND category = ?", (day, category)),
+                ]
+                for label, cap, where, args in checks:
+                    if cap and self._spent(where, args) + cost_usd > cap + 1e-9:
+                        self.refused += 1
+                        raise BudgetExceeded(f"{label} Places budget of ${cap:.2f} reached")
+                self._db.execute(
+                    "INSERT INTO spend (day, category, endpoint, calls, cost_usd) VALUES (?, ?, ?, 1, ?)"
+                    " ON CONFLICT (day, category, endpoint) DO UPDATE SET"
+                    " calls = calls + 1, cost_usd = cost_usd + excluded.cost_usd",
+                    (day, category, endpoint, cost_usd),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def remaining(self, category: Optional[str] = None) -> Dict[str, Any]:
+        """Spend so far and what is left under each cap (None = uncapped)."""
+        day = today()
+        with self._lock:
+            spent_day = self._spent("day = ?", (day,))
+            spent_month = self._spent("day LIKE ?", (day[:7] + "-%",))
+            spent_cat = self._spent("day = ? AND category = ?", (day, category)) if category else 0.0
+            cur = self._db.execute(
+                "SELECT category, endpoint, calls, cost_usd FROM spend WHERE day = ? ORDER BY category, endpoint",
+                (day,),
+            )
+            rows = cur.fetchall()
+        left = lambda cap, spent: round(max(0.0, cap - spent), 4) if cap else None
+        out = {
+            "day": day,
+            "spent_today_usd": round(spent_day, 4), "left_today_usd": left(self.daily_usd, spent_day),
+            "spent_month_usd": round(spent_month, 4), "left_month_usd": left(self.monthly_usd, spent_month),
+            "today": [{"category": c, "endpoint": e, "calls": n, "cost_usd": round(usd, 4)}
+                      for c, e, n, usd in rows],
+        }
+        if category:
+            out["left_category_today_usd"] = left(self.category_daily_usd, spent_cat)
+        return out
+
+    def summary(self) -> str:
+        r = self.remaining()
+        fmt = lambda v: "uncapped" if v is None else f"${v:.2f} left"
+        return (f"today ${r['spent_today_usd']:.2f} spent ({fmt(r['left_today_usd'])}), "
+                f"month ${r['spent_month_usd']:.2f} spent ({fmt(r['left_month_usd'])})")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def add_ledger_args(parser) -> None:
+    parser.add_argument("--budget-ledger", type=str, default=str(DEFAULT_LEDGER_PATH),
+                        help="SQLite ledger counting Places calls per category per day across runs.")
+    parser.add_argument("--no-budget-ledger", action="store_true",
+                        help="Neither count calls in nor check the budget ledger.")
+    parser.add_argument("--budget-daily-usd", type=float, default=0.0,
+                        help="Refuse Places calls once today's spend across all categories reaches this (0 = no cap).")
+    parser.add_argument("--budget-monthly-usd", type=float, default=0.0,
+                        help="Refuse Places calls once this month's spend across all categories reaches this.")
+    parser.add_argument("--budget-category-daily-usd", type=float, default=0.0,
+                        help="Refuse Places calls once one category's spend today reaches this.")
+
+def ledger_from_args(args) -> Optional[BudgetLedger]:
+    if getattr(args, "no_budget_ledger", False):
+        return None
+    return BudgetLedger(Path(getattr(args, "budget_ledger", DEFAULT_LEDGER_PATH)),
+                        daily_usd=getattr(args, "budget_daily_usd", 0.0),
+                        monthly_usd=getattr(args, "budget_monthly_usd", 0.0),
+                        category_daily_usd=getattr(args, "budget_category_daily_usd", 0.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show today's Places spend and the budget left.")
+    parser.add_argument("--ledger", type=str, default=str(DEFAULT_LEDGER_PATH))
+    parser.add_argument("--daily-usd", type=float, default=0.0)
+    parser.add_argument("--monthly-usd", type=float, default=0.0)
+    args = parser.parse_args()
+    ledger = BudgetLedger(Path(args.ledger), daily_usd=args.daily_usd, monthly_usd=args.monthly_usd)
+    r = ledger.remaining()
+    for e in r["today"]:
+        print(f"{e['category']:<28} {e['endpoint']:<11} {e['calls']:>7} calls  ${e['cost_usd']:>9.2f}")
+    print(f"[budget] {r['day']}: {ledger.summary()}")
+    ledger.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Yield-driven query planning (--plan-by-yield).
+
+- Every finished root (keyword, center) query stores how many *novel*
+  place_ids it returned: ones not in the category CSV when the run started and
+  not found earlier in the same run
+- The next run orders its plan by an exponentially weighted average of that
+  yield (pairs with no history first, so new keywords/centers get tried)
+- Pairs whose average stayed under --plan-min-yield for --plan-min-runs runs
+  are skipped, and re-probed once every --plan-reprobe-every skips in case
+  the area changed
+History lives in SQLite next to the Details cache, so it persists in CI too.
+"""
+
+from __future__ import annotations
+import sqlite3, threading, time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cache import CACHE_DIR
+
+DEFAULT_PLAN_DB = CACHE_DIR / "query_yield.sqlite"
+DEFAULT_MIN_YIELD = 1.0
+DEFAULT_MIN_RUNS = 2
+DEFAULT_REPROBE_EVERY = 5
+EWMA_ALPHA = 0.5   # weight of the latest run
+
+
+def pair_key(names: List[str], keyword: str, place_type: Optional[str], tile) -> str:
+    lat, lng, radius_m, _ = tile
+    return f"{'+'.join(sorted(names))}|{keyword.casefold()}|{place_type or ''}|{lat:.5f},{lng:.5f}|{radius_m}"
+
+
+class YieldPlanner:
+    def __init__(self, path: Path = DEFAULT_PLAN_DB, min_yield: float = DEFAULT_MIN_YIELD,
+                 min_runs: int = DEFAULT_MIN_RUNS, reprobe_every: int = DEFAULT_REPROBE_EVERY):
+        self.path = Path(path)
+        self.min_yield = min_yield
+        self.min_runs = max(1, min_runs)
+        self.reprobe_every = max(1, reprobe_every)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pairs ("
+            " key TEXT PRIMARY KEY,"
+            " ewma REAL NOT NULL,"
+            " runs INTEGER NOT NULL,"
+            " last_novel INTEGER NOT NULL,"
+            " skipped INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        # category → place_ids known before this run started (or claimed during it)
+        self.known: Dict[str, set] = {}
+
+    # ---- novelty ----
+    def prime(self, name: str, place_ids) -> None:
+        """Register place_ids a category already has (its CSV and seeded rows)."""
+        with self._lock:
+            self.known.setdefault(name, set()).update(place_ids)
+
+    def is_novel(self, name: str, pid: str) -> bool:
+        """True the first time a place_id unknown to the category is seen (then remembered)."""
+        with self._lock:
+            seen = self.known.setdefault(name, set())
+            if pid in seen:
+                return False
+            seen.add(pid)
+            return True
+
+    # ---- history ----
+    def _row(self, key: str) -> Optional[Tuple[float, int, int, int]]:
+        cur = self._db.execute("SELECT ewma, runs, last_novel, skipped FROM pairs WHERE key = ?", (key,))
+        return cur.fetchone()
+
+    def record(self, key: str, novel: int) -> None:
+        with self._lock:
+            row = self._row(key)
+            if row is None:
+                ewma, runs = float(novel), 1
+            else:
+                ewma, runs = EWMA_ALPHA * novel + (1 - EWMA_ALPHA) * row[0], row[1] + 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO pairs (key, ewma, runs, last_novel, skipped, updated_at)"
+                " VALUES (?, ?, ?, ?, 0, ?)",
+                (key, ewma, runs, int(novel), time.time()),
+            )
+            self._db.commit()
+
+    def order(self, entries: List[Tuple[str, object]]) -> Tuple[List[object], int, int]:
+        """
+        Sort (pair key, plan entry) by expected yield, dropping dead pairs.
+        Returns (entries to run, skipped count, re-probed count).
+        """
+        keep, skipped, reprobed = [], 0, 0
+        with self._lock:
+            for idx, (key, entry) in enumerate(entries):
+                row = self._row(key)
+                if row is None:
+                    keep.append((float("inf"), idx, entry))
+                    continue
+                ewma, runs, _, skips = row
+                if runs >= self.min_runs and ewma < self.min_yield:
+                    if skips < self.reprobe_every:
+                        self._db.execute("UPDATE pairs SET skipped = skipped + 1 WHERE key = ?", (key,))
+                        skipped += 1
+                        continue
+                    reprobed += 1
+                keep.append((ewma, idx, entry))
+            self._db.commit()
+        keep.sort(key=lambda x: (-x[0], x[1]))
+        return [e for _, _, e in keep], skipped, reprobed
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def add_planner_args(parser) -> None:
+    parser.add_argument("--plan-by-yield", action="store_true",
+                        help="Order (keyword, center) queries by past new-place yield and skip dead pairs.")
+    parser.add_argument("--plan-db", type=str, default=str(DEFAULT_PLAN_DB),
+                        help="SQLite file holding per-pair yield history.")
+    parser.add_argument("--plan-min-yield", type=float, default=DEFAULT_MIN_YIELD,
+                        help="Skip pairs whose average new places per run is below this.")
+    parser.add_argument("--plan-min-runs", type=int, default=DEFAULT_MIN_RUNS,
+                        help="Runs of history needed before a pair can be skipped.")
+    parser.add_argument("--plan-reprobe-every", type=int, default=DEFAULT_REPROBE_EVERY,
+                        help="Run a skipped pair again after it has been skipped this many times.")
+
+def planner_from_args(args) -> Optional[YieldPlanner]:
+    if not getattr(args, "plan_by_yield", False):
+        return None
+    return YieldPlanner(Path(args.plan_db), min_yield=args.plan_min_yield,
+                        min_runs=args.plan_min_runs, reprobe_every=args.plan_reprobe_every)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Per-endpoint rate limiting and cost accounting for the Places engine.
+
+- One token bucket per endpoint (Text Search, Place Details), shared by all
+  worker threads, so a run goes exactly as fast as the configured QPS allows
+- Live counters: calls, time spent waiting for a token, response latency
+  (p50/p95), estimated spend; a CostMeter gives the same count for one query
+- Costs use Google's legacy Places SKUs (USD per 1000 requests); Details are
+  priced by the data tiers their field list touches
+"""
+
+from __future__ import annotations
+import math, threading, time
+from typing import Dict, Iterable, List, Optional
+
+TEXTSEARCH = "textsearch"
+DETAILS = "details"
+ENDPOINTS = (TEXTSEARCH, DETAILS)
+
+DEFAULT_TEXTSEARCH_QPS = 5.0
+DEFAULT_DETAILS_QPS = 10.0
+
+# USD per 1000 requests (legacy Places API list prices)
+TEXTSEARCH_PER_1000 = 32.0
+DETAILS_BASE_PER_1000 = 17.0
+DETAILS_TIER_PER_1000 = {"basic": 0.0, "contact": 3.0, "atmosphere": 5.0}
+
+# Which billing tier each Details field falls under
+FIELD_TIERS = {
+    "place_id": "basic", "name": "basic", "formatted_address": "basic",
+    "geometry/location": "basic", "geometry": "basic", "url": "basic",
+    "business_status": "basic", "types": "basic",
+    "international_phone_number": "contact", "formatted_phone_number": "contact",
+    "website": "contact", "current_opening_hours": "contact", "opening_hours": "contact",
+    "editorial_summary": "atmosphere", "rating": "atmosphere",
+    "user_ratings_total": "atmosphere", "price_level": "atmosphere",
+}
+
+
+def details_cost_per_1000(fields: Iterable[str]) -> float:
+    tiers = {FIELD_TIERS.get(f, "atmosphere") for f in fields}
+    return DETAILS_BASE_PER_1000 + sum(DETAILS_TIER_PER_1000[t] for t in tiers)
+
+def call_cost_usd(endpoint: str, fields: Iterable[str] = ()) -> float:
+    """Estimated price of one request to `endpoint` (Details priced by `fields`)."""
+    return (TEXTSEARCH_PER_1000 if endpoint == TEXTSEARCH else details_cost_per_1000(fields)) / 1000.0
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100); 0.0 for no samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, math.ceil(q / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/sec, holding at most `burst` tokens."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                need = (1.0 - self._tokens) / self.rate
+            time.sleep(need)
+            waited += need
+
+
+class CostMeter:
+    """Requests actually sent, and their cost, on behalf of one query (from any thread)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {e: 0 for e in ENDPOINTS}
+        self.cost_usd = 0.0
+
+    def add(self, endpoint: str, fields: Iterable[str] = ()) -> None:
+        cost = call_cost_usd(endpoint, fields)
+        with self._lock:
+            self.calls[endpoint] += 1
+            self.cost_usd += cost
+
+
+class QuotaTracker:
+    """Token buckets plus call/wait/cost counters for every Places endpoint."""
+
+    def __init__(self, textsearch_qps: float = DEFAULT_TEXTSEARCH_QPS,
+                 details_qps: float = DEFAULT_DETAILS_QPS):
+        self.buckets = {
+            TEXTSEARCH: TokenBucket(textsearch_qps),
+            DETAILS: TokenBucket(details_qps),
+        }
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {e: 0 for e in ENDPOINTS}
+        self.waited: Dict[str, float] = {e: 0.0 for e in ENDPOINTS}
+        self.cost_usd: Dict[str, float] = {e: 0.0 for e in ENDPOINTS}
+        self.latency_sec: Dict[str, List[float]] = {e: [] for e in ENDPOINTS}
+        self.started = time.monotonic()
+
+    def acquire(self, endpoint: str) -> None:
+        waited = self.buckets[endpoint].acquire()
+        if waited:
+            with self._lock:
+                self.waited[endpoint] += waited
+
+    def record(self, endpoint: str, fields: Iterable[str] = (), latency_sec: Optional[float] = None) -> None:
+        """Count one billable request (call after it was actually sent)."""
+        cost = call_cost_usd(endpoint, fields)
+        with self._lock:
+            self.calls[endpoint] += 1
+            self.cost_usd[endpoint] += cost
+            if latency_sec is not None:
+                self.latency_sec[endpoint].append(latency_sec)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            elapsed = max(1e-6, time.monotonic() - self.started)
+            return {e: {"calls": self.calls[e],
+                        "qps": round(self.calls[e] / elapsed, 2),
+                        "waited_sec": round(self.waited[e], 2),
+                        "p50_ms": round(percentile(self.latency_sec[e], 50) * 1000, 1),
+                        "p95_ms": round(percentile(self.latency_sec[e], 95) * 1000, 1),
+                        "cost_usd": round(self.cost_usd[e], 4)} for e in ENDPOINTS}
+
+    def summary(self) -> str:
+        snap = self.snapshot()
+        total = sum(v["cost_usd"] for v in snap.values())
+        parts = [f"{e} {v['calls']} calls @ {v['qps']}/s (waited {v['waited_sec']}s, ${v['cost_usd']:.2f})"
+                 for e, v in snap.items()]
+        return "; ".join(parts) + f"; est. total ${total:.2f}"
+
+
+def add_quota_args(parser) -> None:
+    parser.add_argument("--textsearch-qps", type=float, default=DEFAULT_TEXTSEARCH_QPS,
+                        help="Max Text Search requests per second across all workers (0 = unlimited).")
+    parser.add_argument("--details-qps", type=float, default=None,
+                        help="Max Place Details requests per second across all workers (0 = unlimited). "
+                             f"Defaults to 1/--details-throttle-sec when that is set, else {DEFAULT_DETAILS_QPS:g}.")
+
+def quota_from_args(args) -> QuotaTracker:
+    details_qps = getattr(args, "details_qps", None)
+    if details_qps is None:
+        throttle = getattr(args, "details_throttle_sec", 0) or 0
+        details_qps = (1.0 / throttle) if throttle > 0 else DEFAULT_DETAILS_QPS
+    return QuotaTracker(textsearch_qps=getattr(args, "textsearch_qps", DEFAULT_TEXTSEARCH_QPS),
+                        details_qps=details_qps)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Sharded fetch runs (--shard i/N) and the merge step that joins them.
+
+- Every root (keyword, type, center) query of the plan belongs to exactly one
+  of N shards, by a stable hash of its query id, so N runners given the same
+  flags split the plan without overlap; --refresh splits place_ids the same way,
+  and each --refresh shard writes only its own rows, so every row of the
+  merge comes from the shard that refreshed it
+- A shard writes its rows to its own partial CSV (--shard-dir), plus its own
+  journal and report, and never touches the category CSV
+- `python -m places.shard` merges the partial CSVs into the category CSV with
+  merge_rows() precedence, in shard order (the newest last_updated first),
+  sorted like a normal run's output:
+    python -m places.shard --out ../data/sources/hotels.csv tmp/shards/hotels.shard*.csv
+"""
+
+from __future__ import annotations
+import argparse, hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cache import ROOT
+
+DEFAULT_SHARD_DIR = ROOT / "scripts" / "tmp" / "shards"
+
+Shard = Tuple[int, int]   # (i, N), 1 <= i <= N
+
+
+def parse_shard(spec: Optional[str]) -> Optional[Shard]:
+    """ "2/4" → (2, 4); None/"" → None. Raises ValueError on anything else."""
+    if not spec:
+        return None
+    try:
+        i_s, n_s = spec.split("/")
+        i, n = int(i_s), int(n_s)
+    except Exception:
+        raise ValueError(f"--shard must look like i/N, got {spec!r}")
+    if not 1 <= i <= n:
+        raise ValueError(f"--shard {spec}: i must be between 1 and N")
+    return i, n
+
+def shard_label(shard: Shard) -> str:
+    return f"shard{shard[0]}of{shard[1]}"
+
+def in_shard(key: str, shard: Optional[Shard]) -> bool:
+    """Whether `key` (a query id or place_id) belongs to `shard`; always True unsharded."""
+    if shard is None:
+        return True
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard[1] == shard[0] - 1
+
+def shard_csv(shard_dir: Path, name: str, shard: Shard) -> Path:
+    return Path(shard_dir) / f"{name}.{shard_label(shard)}.csv"
+
+
+def add_shard_args(parser) -> None:
+    parser.add_argument("--shard", type=str, default=None,
+                        help="Run only shard i of N of the query plan (e.g. 2/4) and write a partial CSV "
+                             "to --shard-dir; join shards with python -m places.shard.")
+    parser.add_argument("--shard-dir", type=str, default=str(DEFAULT_SHARD_DIR),
+                        help="Directory for the partial CSVs of --shard runs.")
+
+
+# ───────────────────────── Merge ──────────────────────────
+def shard_order(path: Path) -> Tuple[int, str]:
+    """Sort key putting shard1of4 before shard2of4 …; other files by name after them."""
+    stem = Path(path).stem
+    if ".shard" in stem:
+        try:
+            return int(stem.rsplit(".shard", 1)[1].split("of")[0]), stem
+        except ValueError:
+            pass
+    return 1 << 30, stem
+
+def merge_csvs(paths: List[Path], base: Optional[Path] = None) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Rows of `base` (if given) then every shard CSV in shard order, merged per
+    place_id with merge_rows(); a copy with a newer last_updated (a refreshed
+    row) wins over the older one like in --refresh. Returns (header, rows
+    sorted like Category.write).
+    """
+    from .engine import merge_rows, refreshed_row, seed_rows_from_csv, sort_rows
+
+    rows_by_pid: Dict[str, Dict[str, str]] = {}
+    header: List[str] = []
+    for path in ([base] if base is not None else []) + sorted(paths, key=shard_order):
+        part: Dict[str, Dict[str, str]] = {}
+        for h in seed_rows_from_csv(Path(path), part, []):
+            if h not in header:
+                header.append(h)
+        for pid, row in part.items():
+            old = rows_by_pid.get(pid)
+            if old is None:
+                rows_by_pid[pid] = row
+                continue
+            new_at, old_at = (row.get("last_updated") or "").strip(), (old.get("last_updated") or "").strip()
+            if new_at > old_at:
+                rows_by_pid[pid] = refreshed_row(old, row)
+            elif new_at < old_at:
+                rows_by_pid[pid] = refreshed_row(row, old)
+            else:
+                rows_by_pid[pid] = merge_rows(old, row)
+    return header, sort_rows(list(rows_by_pid.values()))
+
+def main():
+    from .engine import write_csv
+
+    parser = argparse.ArgumentParser(description="Merge the partial CSVs of a sharded fetch run.")
+    parser.add_argument("shards", nargs="+", help="Partial CSVs written by --shard runs.")
+    parser.add_argument("--out", type=str, required=True, help="Category CSV to write.")
+    parser.add_argument("--include-existing", action="store_true",
+                        help="Start from the rows already in --out (shards of an --incremental run already carry them).")
+    args = parser.parse_args()
+    out = Path(args.out)
+    base = out if args.include_existing and out.exists() else None
+    header, rows = merge_csvs([Path(p) for p in args.shards], base)
+    write_csv(out, header, rows)
+    print(f"Merged {len(args.shards)} shard CSVs → {len(rows)} rows → {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the Places Text Search / Details endpoints.
+
+- Replays fixtures recorded with --record-fixtures (JSONL: endpoint, params,
+  response); a recorded query's follow-up pages are linked through their
+  next_page_token
+- Queries and place_ids without a fixture get deterministic synthetic
+  results (--synthetic-results per page, up to 3 pages), or ZERO_RESULTS /
+  NOT_FOUND with --no-synthetic
+- next_page_token only becomes valid --token-delay seconds after it was
+  issued (INVALID_REQUEST before that), like Google's
+- --error-rate injects OVER_QUERY_LIMIT / UNKNOWN_ERROR statuses and HTTP 500s;
+  --latency-ms adds a fixed delay per response
+
+Run from scripts/ and point a fetcher at it:
+  python -m places.standin --port 8765 --fixtures tmp/fixtures/places.jsonl
+  python fetch_restaurants.py --places-base-url http://127.0.0.1:8765 --no-details-cache
+"""
+
+from __future__ import annotations
+import argparse, hashlib, json, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PORT = 8765
+DEFAULT_TOKEN_DELAY_SEC = 2.0
+DEFAULT_SYNTHETIC_RESULTS = 20
+MAX_PAGES = 3
+
+ERROR_STATUSES = ["OVER_QUERY_LIMIT", "UNKNOWN_ERROR"]
+
+QueryKey = Tuple[str, str, str, str]   # (query, type, location, radius)
+
+
+def query_key(params: Dict[str, Any]) -> QueryKey:
+    return (str(params.get("query", "")).casefold(), str(params.get("type", "") or ""),
+            str(params.get("location", "")), str(params.get("radius", "")))
+
+
+class Fixtures:
+    """Recorded Text Search page lists per query and Details payloads per place_id."""
+
+    def __init__(self):
+        self.pages: Dict[QueryKey, List[Dict[str, Any]]] = {}
+        self.details: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, paths: List[Path]) -> "Fixtures":
+        fx = cls()
+        token_owner: Dict[str, QueryKey] = {}
+        for path in paths:
+            with Path(path).open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except Exception:
+                        continue
+                    params, resp = rec.get("params") or {}, rec.get("response") or {}
+                    if rec.get("endpoint") == "details":
+                        if resp.get("status") == "OK" and params.get("place_id"):
+                            fx.details[params["place_id"]] = resp
+                        continue
+                    # Not-yet-valid page token polls (INVALID_REQUEST) and errors are
+                    # not pages; older recordings carry them
+                    if resp.get("status") not in ("OK", "ZERO_RESULTS"):
+                        continue
+                    if "pagetoken" in params:
+                        key = token_owner.get(params["pagetoken"])
+                        if key is None:
+                            continue
+                    else:
+                        key = query_key(params)
+                        fx.pages[key] = []
+                    fx.pages[key].append(resp)
+                    if resp.get("next_page_token"):
+                        token_owner[resp["next_page_token"]] = key
+        return fx
+
+
+class StandIn:
+    """Request handling state shared by the server threads."""
+
+    def __init__(self, fixtures: Fixtures, token_delay: float = DEFAULT_TOKEN_DELAY_SEC,
+                 error_rate: float = 0.0, latency_ms: float = 0.0,
+                 synthetic: bool = True, synthetic_results: int = DEFAULT_SYNTHETIC_RESULTS,
+                 seed: int = 0):
+        self.fixtures = fixtures
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.latency_ms = latency_ms
+        self.synthetic = synthetic
+        self.synthetic_results = synthetic_results
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # token → (query key, page index, issued at)
+        self._tokens: Dict[str, Tuple[QueryKey, int, float]] = {}
+        self.requests = {"textsearch": 0, "details": 0}
+
+    # ---- helpers ----
+    def _count(self, endpoint: str) -> None:
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    def _roll_error(self) -> Optional[str]:
+        with self._lock:
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return self._rng.choice(ERROR_STATUSES + ["HTTP_500"])
+        return None
+
+    def _issue_token(self, key: QueryKey, page: int) -> str:
+        token = hashlib.sha1(f"{key}|{page}|{time.time()}".encode()).hexdigest()
+        with self._lock:
+            self._tokens[token] = (key, page, time.monotonic())
+        return token
+
+    def _synthetic_page(self, key: QueryKey, page: int) -> Dict[str, Any]:
+        if not self.synthetic:
+            return {"status": "ZERO_RESULTS", "results": []}
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:10]
+        try:
+            lat, lng = (float(x) for x in key[2].split(","))
+        except Exception:
+            lat, lng = 23.6, 58.4
+        results = []
+        for i in range(self.synthetic_results):
+            n = page * self.synthetic_results + i
+            results.append({
+                "place_id": f"synthetic-{digest}-{n}",
+                "name": f"{key[0].title() or 'Place'} {n}",
+                "formatted_address": "Muscat, Oman",
+                "geometry": {"location": {"lat": lat + n * 1e-4, "lng": lng - n * 1e-4}},
+                "rating": round(3.5 + (n % 15) / 10, 1),
+                "user_ratings_total": 10 + n,
+                "business_status": "OPERATIONAL",
+            })
+        return {"status": "OK", "results": results}
+
+    def _page(self, key: QueryKey, page: int) -> Dict[str, Any]:
+        recorded = self.fixtures.pages.get(key)
+        if recorded is not None:
+            data = dict(recorded[page]) if page < len(recorded) else {"status": "INVALID_REQUEST"}
+            has_more = page + 1 < len(recorded)
+        else:
+            data = self._synthetic_page(key, page)
+            has_more = data["status"] == "OK" and page + 1 < MAX_PAGES
+        data.pop("next_page_token", None)
+        if has_more:
+            data["next_page_token"] = self._issue_token(key, page + 1)
+        return data
+
+    # ---- endpoints ----
+    def textsearch(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        self._count("textsearch")
+        err = self._roll_error()
+        if err == "HTTP_500":
+            return 500, {"error": "simulated"}
+        if err:
+            return 200, {"status": err, "results": [], "error_message": "simulated by stand-in"}
+        token = params.get("pagetoken")
+        if not token:
+            return 200, self._page(query_key(params), 0)
+        with self._lock:
+            entry = self._tokens.get(token)
+        if entry is None:
+            return 200, {"status": "INVALID_REQUEST", "results": []}
+        key, page, issued = entry
+        if time.monotonic() - issued < self.token_delay:
+            return 200, {"status": "INVALID_REQUEST", "results": []}
+        return 200, self._page(key, page)
+
+    def details(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        self._count("details")
+        err = self._roll_error()
+        if err == "HTTP_500":
+            return 500, {"error": "simulated"}
+        if err:
+            return 200, {"status": err, "error_message": "simulated by stand-in"}
+        pid = params.get("place_id", "")
+        fields = [f for f in (params.get("fields") or "").split(",") if f]
+        payload = self.fixtures.details.get(pid)
+        if payload is None:
+            if not self.synthetic or not pid:
+                return 200, {"status": "NOT_FOUND"}
+            n = int(pid.rsplit("-", 1)[-1]) if pid.rsplit("-", 1)[-1].isdigit() else 0
+            payload = {"status": "OK", "result": {
+                "place_id": pid, "name": f"Place {n}", "formatted_address": "Muscat, Oman",
+                "geometry": {"location": {"lat": 23.6, "lng": 58.4}},
+                "international_phone_number": f"+968 2400 {n:04d}",
+                "website": f"https://example.com/{pid}" if n % 3 else "",
+                "url": f"https://maps.google.com/?cid={n}",
+                "business_status": "OPERATIONAL",
+                "rating": 4.1, "user_ratings_total": 10 + n, "price_level": n % 4,
+                "current_opening_hours": {"open_now": True, "weekday_text": []},
+                "editorial_summary": {"overview": "Synthetic place served by the local stand-in."},
+            }}
+        result = payload.get("result", {}) or {}
+        # Mimic Google: only the requested top-level fields come back
+        if fields:
+            wanted = {f.split("/")[0] for f in fields}
+            result = {k: v for k, v in result.items() if k in wanted}
+        return 200, {"status": "OK", "result": result}
+
+
+def make_handler(standin: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path.endswith("/textsearch/json"):
+                code, body = standin.textsearch(params)
+            elif url.path.endswith("/details/json"):
+                code, body = standin.details(params)
+            else:
+                code, body = 404, {"error": "unknown endpoint"}
+            if standin.latency_ms:
+                time.sleep(standin.latency_ms / 1000.0)
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+def serve(standin: StandIn, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Start the stand-in on a daemon thread (port 0 = any free port); returns the server."""
+    server = ThreadingHTTPServer((host, port), make_handler(standin))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def add_standin_args(parser) -> None:
+    parser.add_argument("--fixtures", type=str, action="append", default=[],
+                        help="Fixture JSONL from --record-fixtures (repeatable).")
+    parser.add_argument("--token-delay", type=float, default=DEFAULT_TOKEN_DELAY_SEC,
+                        help="Seconds before a next_page_token is accepted.")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of requests answered with an error status or HTTP 500.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added delay per response.")
+    parser.add_argument("--no-synthetic", action="store_true",
+                        help="Answer unrecorded queries with ZERO_RESULTS / NOT_FOUND.")
+    parser.add_argument("--synthetic-results", type=int, default=DEFAULT_SYNTHETIC_RESULTS,
+                        help="Results per synthetic Text Search page.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for simulated errors.")
+
+def standin_from_args(args) -> StandIn:
+    return StandIn(Fixtures.load([Path(p) for p in args.fixtures]),
+                   token_delay=args.token_delay, error_rate=args.error_rate,
+                   latency_ms=args.latency_ms, synthetic=not args.no_synthetic,
+                   synthetic_results=args.synthetic_results, seed=args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Places Text Search / Details API.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    add_standin_args(parser)
+    args = parser.parse_args()
+    standin = standin_from_args(args)
+    server = serve(standin, args.host, args.port)
+    print(f"Places stand-in on http://{args.host}:{server.server_address[1]} "
+          f"({len(standin.fixtures.pages)} recorded queries, {len(standin.fixtures.details)} recorded places)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
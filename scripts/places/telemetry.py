@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+JSON run report for fetch runs.
+
+- One entry per (keyword, center/tile) query: pages, results, new place_ids,
+  duplicate rate, Details calls queued, requests actually sent (page-token
+  polls included, Details cache hits not) with their cost, and wall time
+- Per-endpoint calls, p50/p95 latency, token-bucket wait and cost (from quota.py)
+- A flat `summary` block meant to be diffed between runs:
+    python -m places.telemetry tmp/reports/a.json tmp/reports/b.json
+"""
+
+from __future__ import annotations
+import argparse, json, threading, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[2]   # repo root (scripts/places/ under root)
+REPORT_DIR = ROOT / "scripts" / "tmp" / "reports"
+
+# Run flags worth keeping next to the numbers they produced
+REPORTED_ARGS = [
+    "radius", "max_pages_per_query", "max_places", "basic_only", "textsearch_rows",
+    "adaptive_tiles", "plan_by_yield", "query_concurrency", "details_concurrency",
+    "textsearch_qps", "details_qps", "incremental", "refresh", "shard",
+]
+
+
+def default_report_path(names: List[str], suffix: str = "") -> Path:
+    return REPORT_DIR / f"{'+'.join(names)}{suffix}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+
+def dup_rate(results: int, new: int) -> float:
+    return round(1.0 - new / results, 3) if results else 0.0
+
+
+class RunReport:
+    def __init__(self, names: List[str], args):
+        self.names = names
+        self.args = {k: getattr(args, k) for k in REPORTED_ARGS if hasattr(args, k)}
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.queries: List[Dict[str, Any]] = []
+
+    def query(self, keyword: str, place_type: Optional[str], tile, cat_names: List[str],
+              stats: Dict[str, Any]) -> None:
+        lat, lng, radius_m, depth = tile
+        pages, results, new = stats.get("pages", 0), stats.get("results", 0), stats.get("new", 0)
+        entry = {
+            "keyword": keyword, "type": place_type or "",
+            "lat": round(lat, 6), "lng": round(lng, 6), "radius_m": radius_m, "depth": depth,
+            "categories": cat_names,
+            "pages": pages, "results": results, "new": new, "dup_rate": dup_rate(results, new),
+            "novel": stats.get("novel", 0),
+            "details": stats.get("details", 0),
+            "saturated": bool(stats.get("saturated")),
+            "textsearch_calls": stats.get("textsearch_calls", 0),
+            "details_calls": stats.get("details_calls", 0),
+            "cost_usd": round(stats.get("cost_usd", 0.0), 4),
+            "wall_sec": round(stats.get("wall_sec", 0.0), 2),
+        }
+        with self._lock:
+            self.queries.append(entry)
+
+    def build(self, endpoints: Dict[str, Dict[str, Any]], rows: Dict[str, int],
+              cache_hits: int = 0, cache_misses: int = 0) -> Dict[str, Any]:
+        with self._lock:
+            queries = list(self.queries)
+        results = sum(q["results"] for q in queries)
+        new = sum(q["new"] for q in queries)
+        cost = sum(e.get("cost_usd", 0.0) for e in endpoints.values())
+        summary = {
+            "categories": "+".join(self.names),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_sec": round(time.time() - self.started, 1),
+            "queries": len(queries),
+            "pages": sum(q["pages"] for q in queries),
+            "results": results,
+            "new": new,
+            "novel": sum(q["novel"] for q in queries),
+            "dup_rate": dup_rate(results, new),
+            "rows": sum(rows.values()),
+            "saturated_queries": sum(1 for q in queries if q["saturated"]),
+            "zero_new_queries": sum(1 for q in queries if not q["new"]),
+            "details_calls": sum(q["details"] for q in queries),
+            "details_cache_hits": cache_hits,
+            "details_cache_misses": cache_misses,
+            "cost_usd": round(cost, 4),
+            "new_per_usd": round(new / cost, 2) if cost else 0.0,
+        }
+        for e, v in endpoints.items():
+            summary[f"{e}_p50_ms"] = v.get("p50_ms", 0.0)
+            summary[f"{e}_p95_ms"] = v.get("p95_ms", 0.0)
+        return {"summary": summary, "args": self.args, "rows": rows,
+                "endpoints": endpoints, "queries": queries}
+
+    def write(self, path: Path, report: Dict[str, Any]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def add_report_args(parser) -> None:
+    parser.add_argument("--report", type=str, default=None,
+                        help="Write the JSON run report here (default: scripts/tmp/reports/<category>-<time>.json).")
+    parser.add_argument("--no-report", action="store_true", help="Do not write a run report.")
+
+
+# ───────────────────── Compare runs ─────────────────────
+def compare(a: Dict[str, Any], b: Dict[str, Any]) -> List[str]:
+    """Side-by-side numeric summary fields of two reports, with the change."""
+    sa, sb = a.get("summary", {}), b.get("summary", {})
+    lines = []
+    for k in sa.keys() | sb.keys():
+        va, vb = sa.get(k), sb.get(k)
+        if isinstance(va, (int, float)) and isinstance(vb, (int, float)) and not isinstance(va, bool):
+            delta = vb - va
+            pct = f" ({delta / va * 100:+.1f}%)" if va else ""
+            lines.append(f"{k:<24} {va:>12} {vb:>12} {delta:>+12.4g}{pct}")
+        elif va != vb:
+            lines.append(f"{k:<24} {va!s:>12} {vb!s:>12}")
+    return sorted(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the summaries of two fetch run reports.")
+    parser.add_argument("before", type=str)
+    parser.add_argument("after", type=str)
+    args = parser.parse_args()
+    a = json.loads(Path(args.before).read_text(encoding="utf-8"))
+    b = json.loads(Path(args.after).read_text(encoding="utf-8"))
+    print(f"{'':<24} {'before':>12} {'after':>12} {'change':>12}")
+    for line in compare(a, b):
+        print(line)
+
+if __name__ == "__main__":
+    main()
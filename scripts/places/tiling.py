@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive quadtree tiling for Text Search.
+
+Each --centers point is a root tile at --radius. A (keyword, tile) query that
+saturates the page limit (a next_page_token was still on offer when we stopped,
+or Google's 60-result ceiling was hit) is split into four children covering the
+same circle at ~0.71× the radius — but only while the tile is still yielding
+mostly new place_ids and the children stay above --tile-min-radius.
+Sparse tiles are never split, so they cost one query as before.
+"""
+
+from __future__ import annotations
+import math
+from typing import Dict, List, Tuple
+
+# Google Text Search never returns more than 3 pages × 20 results
+TEXTSEARCH_RESULT_CEILING = 60
+
+DEFAULT_MIN_RADIUS_M = 800
+DEFAULT_MAX_DEPTH = 3
+DEFAULT_MIN_NEW_RATIO = 0.25
+
+# Offset of each child center and its radius, as fractions of the parent radius.
+# Children at (±r/2, ±r/2) with radius r·√2/2 cover the whole parent circle.
+CHILD_OFFSET = 0.5
+CHILD_RADIUS = math.sqrt(2) / 2
+
+M_PER_DEG_LAT = 111_320.0
+
+Tile = Tuple[float, float, int, int]   # (lat, lng, radius_m, depth)
+
+
+def child_tiles(lat: float, lng: float, radius_m: int, depth: int) -> List[Tile]:
+    """Four quadrant tiles that together cover the parent search circle."""
+    d_m = radius_m * CHILD_OFFSET
+    d_lat = d_m / M_PER_DEG_LAT
+    d_lng = d_m / (M_PER_DEG_LAT * max(0.01, math.cos(math.radians(lat))))
+    r = int(math.ceil(radius_m * CHILD_RADIUS))
+    return [
+        (lat + d_lat, lng - d_lng, r, depth + 1),   # NW
+        (lat + d_lat, lng + d_lng, r, depth + 1),   # NE
+        (lat - d_lat, lng - d_lng, r, depth + 1),   # SW
+        (lat - d_lat, lng + d_lng, r, depth + 1),   # SE
+    ]
+
+def should_split(stats: Dict[str, int], radius_m: int, depth: int, args) -> bool:
+    """Split only saturated tiles that still yield new places and can shrink further."""
+    if not stats.get("saturated"):
+        return False
+    if depth >= getattr(args, "tile_max_depth", DEFAULT_MAX_DEPTH):
+        return False
+    if radius_m * CHILD_RADIUS < getattr(args, "tile_min_radius", DEFAULT_MIN_RADIUS_M):
+        return False
+    results = stats.get("results", 0)
+    if not results:
+        return False
+    return stats.get("new", 0) / results >= getattr(args, "tile_min_new_ratio", DEFAULT_MIN_NEW_RATIO)
+
+def root_tiles(centers: List[Tuple[float, float]], radius_m: int) -> List[Tile]:
+    """The --centers points as depth-0 tiles at --radius."""
+    return [(lat, lng, int(radius_m), 0) for (lat, lng) in centers]
+
+def add_tiling_args(parser) -> None:
+    parser.add_argument("--adaptive-tiles", action="store_true",
+                        help="Treat --centers as root tiles and split saturated (keyword, tile) "
+                             "queries into four smaller tiles.")
+    parser.add_argument("--tile-min-radius", type=int, default=DEFAULT_MIN_RADIUS_M,
+                        help="Never split a tile into children smaller than this radius (meters).")
+    parser.add_argument("--tile-max-depth", type=int, default=DEFAULT_MAX_DEPTH,
+                        help="Maximum number of times a root tile may be subdivided.")
+    parser.add_argument("--tile-min-new-ratio", type=float, default=DEFAULT_MIN_NEW_RATIO,
+                        help="Only split a saturated tile if at least this share of its results were new.")